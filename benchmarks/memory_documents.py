@@ -0,0 +1,109 @@
+"""Peak RSS of one heuristic analysis as the documents grid grows.
+
+Each measurement runs in a fresh interpreter so peaks don't carry over. The
+payload is served through a mocked transport to a real `JogetClient`, so the
+streamed read, the size limit and the bounded grid parser are all exercised.
+
+    python benchmarks/memory_documents.py --documents 100 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+def _payload(documents: int) -> bytes:
+    grid = [
+        {"name": f"Documento {i}", "required": "on", "uploaded": "on" if i % 3 else ""}
+        for i in range(documents)
+    ]
+    return json.dumps({
+        "id": "BENCH-1",
+        "ramo": "Daños",
+        "tipo_tramite": "Emisión",
+        "monto_prima": "1500000",
+        "requiere_reaseguro": "on",
+        "documents": json.dumps(grid),
+    }).encode("utf-8")
+
+
+def _peak_rss_kb() -> int:
+    # Linux reports ru_maxrss in KiB, macOS in bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _measure(payload_path: Path, max_documents: int | None) -> dict:
+    import httpx
+
+    from risk_analyzer.graph import build_app
+    from risk_analyzer.joget_adapter import JogetClient
+    from risk_analyzer.schemas import AnalyzerState
+
+    # Only the raw response bytes exist before the analysis starts
+    body = payload_path.read_bytes()
+    client = JogetClient(
+        base_url="http://joget.bench/jw",
+        username="bench",
+        password="bench",
+        app_id="bench",
+        tramite_form_id="bench",
+        max_payload_bytes=len(body) + 1,
+        max_documents=len(body) if max_documents is None else max_documents,
+    )
+    chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+    client._session = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=iter(chunks))))
+    app = build_app(llm=None, joget_client=client)
+
+    before = _peak_rss_kb()
+    result = app.invoke(AnalyzerState(id="BENCH-1"))
+    after = _peak_rss_kb()
+    return {
+        "documents": result["folio"].document_summary.total,
+        "payload_kb": len(body) // 1024,
+        "kept": len(result["folio"].documents),
+        "missing": result["signals"]["missing_docs_count"],
+        "peak_rss_kb": after,
+        "analysis_rss_kb": after - before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--max-documents", type=int, default=200, help="Materialization cap (JOGET_MAX_DOCUMENTS)")
+    parser.add_argument("--unbounded", action="store_true", help="Also measure with every document materialized")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--child-cap", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(_measure(args.child, args.child_cap)))
+        return
+
+    modes = [("bounded", args.max_documents)] + ([("unbounded", None)] if args.unbounded else [])
+    print(f"{'mode':<10} {'documents':>9} {'payload_kb':>10} {'kept':>6} {'peak_rss_kb':>11} {'analysis_rss_kb':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        payloads = {documents: Path(tmp) / f"{documents}.json" for documents in args.documents}
+        for documents, path in payloads.items():
+            path.write_bytes(_payload(documents))
+        for label, cap in modes:
+            for path in payloads.values():
+                command = [sys.executable, __file__, "--child", str(path)]
+                if cap is not None:
+                    command += ["--child-cap", str(cap)]
+                row = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+                print(
+                    f"{label:<10} {row['documents']:>9} {row['payload_kb']:>10} {row['kept']:>6} "
+                    f"{row['peak_rss_kb']:>11} {row['analysis_rss_kb']:>15}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Priority-aware admission control in front of graph execution."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is served first
+PRIORITIES: dict[str, int] = {"urgent": 0, "normal": 1, "low": 2}
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After."""
+
+    def __init__(self, message: str, *, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    rank: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded priority queue and load shedding.
+
+    - Up to `max_concurrency` analyses run at once.
+    - Up to `max_queue` more wait, served by priority then arrival order.
+    - When the queue is full, a higher-priority arrival evicts the newest
+      lowest-priority waiter (503); otherwise the arrival is refused (429).
+    """
+
+    def __init__(self, *, max_concurrency: int, max_queue: int, retry_after: int = 2, urgency_memo_size: int = 10_000):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._active = 0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._urgency: OrderedDict[str, bool] = OrderedDict()
+        self._urgency_memo_size = urgency_memo_size
+        self.rejected = 0
+        self.shed = 0
+
+    def priority_for(self, folio_id: str, requested: str | None = None) -> str:
+        """Resolve the priority class from an explicit header, else from the folio's last known `es_urgente`."""
+        if requested:
+            requested = requested.strip().lower()
+            if requested not in PRIORITIES:
+                raise ValueError(f"Unknown priority {requested!r}; expected one of {tuple(PRIORITIES)}")
+            return requested
+        return "urgent" if self._urgency.get(folio_id) else "normal"
+
+    def note_urgency(self, folio_id: str, urgent: bool | None) -> None:
+        """Remember a fetched folio's `es_urgente` so later re-analyses are classed without a Joget call."""
+        self._urgency[folio_id] = bool(urgent)
+        self._urgency.move_to_end(folio_id)
+        if len(self._urgency) > self._urgency_memo_size:
+            self._urgency.popitem(last=False)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "shed": self.shed,
+        }
+
+    @asynccontextmanager
+    async def admit(self, priority: str = "normal") -> AsyncIterator[None]:
+        await self._acquire(PRIORITIES[priority])
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, rank: int) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            victim = max(self._waiters, key=lambda w: (w.rank, w.seq), default=None)
+            if victim is None or victim.rank <= rank:
+                self.rejected += 1
+                logger.warning("Admission rejected rank=%d active=%d queued=%d", rank, self._active, len(self._waiters))
+                raise AdmissionRejected("Analysis queue is full", status_code=429, retry_after=self.retry_after)
+            self._waiters.remove(victim)
+            self.shed += 1
+            victim.future.set_exception(
+                AdmissionRejected("Shed in favour of higher-priority work", status_code=503, retry_after=self.retry_after)
+            )
+            logger.warning("Admission shed queued rank=%d for incoming rank=%d", victim.rank, rank)
+
+        waiter = _Waiter(rank, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # The slot was handed over just before cancellation; pass it on
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        if self._waiters:
+            waiter = min(self._waiters, key=lambda w: (w.rank, w.seq))
+            self._waiters.remove(waiter)
+            self._active += 1
+            waiter.future.set_result(None)
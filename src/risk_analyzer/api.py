@@ -1,29 +1,176 @@
 """FastAPI REST API for Risk Analyzer."""
 import logging
 import os
+import secrets
+import time
 from contextlib import asynccontextmanager
 from typing import Dict, Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 from langchain_openai import ChatOpenAI
+from starlette.concurrency import run_in_threadpool
 
+from . import tracing
+from .admission import AdmissionController, AdmissionRejected
 from .config import get_settings
+from .documents import parse_checkbox
 from .graph import build_app
-from .schemas import AnalyzerState
+from .logging_setup import configure_logging
+from .prescoring import PrescoreScheduler, ResultCache
+from .profiling import RequestProfiler
+from .prompt_payload import LLMPayloadBuilder
+from .ratelimit import get_rate_limiter
+from .reporting import ReportFormat, ReportRenderer
+from .schemas import AnalyzerState, JogetEvent, SimulationRequest
+from .simulation import FeatureSnapshot, simulate
+from .tenants import DEFAULT_TENANT, TenantRegistry, cache_key, split_cache_key
 
 logger = logging.getLogger(__name__)
 
 # Global app instance (initialized at startup)
 _graph_app = None
 _llm = None
+_admission: AdmissionController | None = None
+_profiler: RequestProfiler | None = None
+_prescorer: PrescoreScheduler | None = None
+_renderer = ReportRenderer()
+_snapshot: tuple[str, float, FeatureSnapshot] | None = None
+_registry: TenantRegistry | None = None
+
+
+def _graph_factory(client) -> Any:
+    """Compile a graph for one tenant's Joget client, sharing the LLM, limiter and renderer."""
+    settings = get_settings()
+    return build_app(
+        llm=_llm,
+        joget_client=client,
+        rate_limiter=get_rate_limiter(),
+        payload_builder=LLMPayloadBuilder.from_settings(settings),
+        report_renderer=_renderer,
+    )
+
+
+def _ensure_graph() -> None:
+    """Build the LLM, tenant registry and default graph on first use when the lifespan hook did not run."""
+    global _graph_app, _llm, _registry
+    if _graph_app is not None:
+        return
+    logger.info("Lazy initialization on first request")
+    env_file = os.getenv("ENV_FILE", ".env")
+    if os.path.exists(env_file):
+        load_dotenv(env_file)
+    
+    settings = get_settings()
+    _llm = ChatOpenAI(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+    )
+    _registry = TenantRegistry.from_settings(settings, _graph_factory)
+    _graph_app = _registry.get(DEFAULT_TENANT).graph
+
+
+def _graph_for(tenant: str) -> Any:
+    """Return the compiled graph of `tenant`; raises KeyError for unknown tenants."""
+    _ensure_graph()
+    if tenant == DEFAULT_TENANT:
+        return _graph_app
+    if _registry is None:
+        raise KeyError(tenant)
+    return _registry.get(tenant).graph
+
+
+def _to_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a graph result into the /analyze JSON payload."""
+    # Convert Pydantic model to dict for JSON serialization
+    folio_dict = result["folio"].model_dump() if result.get("folio") else None
+    return {
+        "id": result.get("id"),
+        "folio": folio_dict,
+        "signals": result.get("signals", {}),
+        "risk": result.get("risk", {}),
+        "report": result.get("report"),
+    }
+
+
+def _get_admission() -> AdmissionController:
+    """Return the process-wide admission controller, creating it from settings on first use."""
+    global _admission
+    if _admission is None:
+        settings = get_settings()
+        _admission = AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            retry_after=settings.admission_retry_after,
+        )
+        logger.info(f"Initialized admission control: {_admission.stats()}")
+    return _admission
+
+
+def _get_profiler() -> RequestProfiler | None:
+    """Return the request profiler, or None unless PROFILE_ENABLED is set."""
+    global _profiler
+    if _profiler is None:
+        settings = get_settings()
+        if not settings.profile_enabled:
+            return None
+        _profiler = RequestProfiler(
+            sample_rate=settings.profile_sample_rate,
+            capacity=settings.profile_buffer_size,
+            trace_memory=settings.profile_trace_memory,
+        )
+        logger.info(f"Initialized request profiler with sample_rate={settings.profile_sample_rate}")
+    return _profiler
+
+
+def _get_snapshot() -> FeatureSnapshot | None:
+    """Load the simulation snapshot, reloading it when the file changes."""
+    global _snapshot
+    path = get_settings().simulation_snapshot_path
+    if not path or not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _snapshot is None or _snapshot[:2] != (path, mtime):
+        _snapshot = (path, mtime, FeatureSnapshot.load(path))
+    return _snapshot[2]
+
+
+async def _prescore(key: str) -> Dict[str, Any]:
+    """Run one background analysis at low priority so live requests go first."""
+    tenant, id = split_cache_key(key)
+    graph = _graph_for(tenant)
+    admission = _get_admission()
+    with tracing.span("prescore", folio_id=id, tenant=tenant):
+        async with admission.admit("low"):
+            result = await run_in_threadpool(graph.invoke, AnalyzerState(id=id))
+    if result.get("folio") is not None:
+        admission.note_urgency(key, result["folio"].es_urgente)
+    return _to_response(result)
+
+
+def _is_admin(token: str | None) -> bool:
+    """Check an `X-Admin-Token` header against PROFILE_ADMIN_TOKEN; always False while it is unset."""
+    expected = get_settings().profile_admin_token
+    if not expected or token is None:
+        return False
+    return secrets.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+def _get_prescorer() -> PrescoreScheduler:
+    """Return the webhook pre-scoring scheduler and its result cache."""
+    global _prescorer
+    if _prescorer is None:
+        settings = get_settings()
+        cache = ResultCache(ttl_seconds=settings.prescore_cache_ttl_seconds, max_entries=settings.prescore_cache_size)
+        _prescorer = PrescoreScheduler(_prescore, cache, debounce_seconds=settings.prescore_debounce_seconds)
+    return _prescorer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - initialize resources at startup."""
-    global _graph_app, _llm
+    global _graph_app, _llm, _registry
     
     # Load environment variables
     env_file = os.getenv("ENV_FILE", ".env")
@@ -31,22 +178,43 @@ async def lifespan(app: FastAPI):
         load_dotenv(env_file)
         logger.info(f"Loaded environment from {env_file}")
     
-    # Initialize LLM
     settings = get_settings()
+    log_listener = configure_logging(
+        level=settings.log_level.upper(),
+        fmt=settings.log_format,
+        debug_sample_rate=settings.log_debug_sample_rate,
+    )
+    tracer = tracing.configure_tracing(
+        settings.tracing_exporter,
+        jsonl_path=settings.tracing_jsonl_path,
+        sample_rate=settings.tracing_sample_rate,
+    )
+    
+    # Initialize LLM
     _llm = ChatOpenAI(
         model=settings.llm_model,
         temperature=settings.llm_temperature,
     )
     logger.info(f"Initialized ChatOpenAI with model={settings.llm_model}, temperature={settings.llm_temperature}")
     
-    # Build LangGraph application
-    _graph_app = build_app(llm=_llm)
-    logger.info("LangGraph application initialized")
+    # Build per-tenant Joget clients and the default LangGraph application
+    _registry = TenantRegistry.from_settings(settings, _graph_factory)
+    _graph_app = _registry.get(DEFAULT_TENANT).graph
+    logger.info(f"LangGraph application initialized for tenants={_registry.names()}")
+    _get_admission()
+    _get_prescorer()
     
     yield
     
     # Cleanup on shutdown
     logger.info("Shutting down API")
+    if _prescorer is not None:
+        _prescorer.cancel_all()
+    if _registry is not None:
+        _registry.close()
+    tracer.close()
+    if log_listener is not None:
+        log_listener.stop()
 
 
 app = FastAPI(
@@ -64,61 +232,225 @@ async def health_check():
 
 
 @app.post("/analyze/{id}")
-async def analyze_risk(id: str) -> Dict[str, Any]:
+async def analyze_risk(
+    id: str,
+    http_response: Response,
+    report_format: ReportFormat = Query("markdown", alias="format"),
+    refresh: bool = Query(False),
+    x_priority: str | None = Header(None),
+    x_debug_profile: str | None = Header(None),
+    x_admin_token: str | None = Header(None),
+    x_joget_tenant: str | None = Header(None),
+) -> Dict[str, Any]:
     """
     Analyze risk for a given folio ID.
     
     Args:
         id: The primary key/folio ID from Joget
+        report_format: Report output format (markdown, text or html)
+        refresh: Ignore any pre-scored result and run the graph again
+        x_priority: Optional `X-Priority` header (urgent, normal or low)
+        x_debug_profile: Optional `X-Debug-Profile` header (1/true/yes/on) forcing a profile (when profiling is enabled)
+        x_admin_token: `X-Admin-Token` header matching PROFILE_ADMIN_TOKEN; `X-Debug-Profile` is ignored without it
+        x_joget_tenant: Optional `X-Joget-Tenant` header selecting the Joget app (default tenant otherwise)
         
     Returns:
-        JSON with id, folio data, signals, risk assessment (with baseline_score and llm_delta), and markdown report
+        JSON with id, folio data, signals, risk assessment (with baseline_score and llm_delta), and markdown report.
+        `signals.missing_docs` holds at most the first JOGET_MAX_MISSING_NAMES names; `signals.missing_docs_count` is the full count.
     """
-    global _graph_app, _llm
+    tenant = x_joget_tenant or DEFAULT_TENANT
+    force_profile = parse_checkbox(x_debug_profile)
+    if force_profile and not _is_admin(x_admin_token):
+        logger.warning(f"Ignoring X-Debug-Profile without a valid admin token for id={id}")
+        force_profile = False
+    with tracing.span("analyze", folio_id=id, tenant=tenant, format=report_format) as span:
+        try:
+            return await _analyze(span, id, tenant, http_response, report_format, refresh, x_priority, force_profile)
+        except HTTPException as e:
+            span.set_attribute("status_code", e.status_code)
+            raise
+
+
+def _as_markdown(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return `response` with its report rendered as markdown, the format cached entries hold."""
+    if response.get("folio") is None:
+        return response
+    signals = response["signals"]
+    report = _renderer.render(
+        response["folio"].get("id", response.get("id")),
+        response["risk"],
+        signals.get("missing_docs", []),
+        "markdown",
+        missing_count=signals.get("missing_docs_count"),
+    )
+    return {**response, "report": report}
+
+
+async def _analyze(
+    span: Any,
+    id: str,
+    tenant: str,
+    http_response: Response,
+    report_format: ReportFormat,
+    refresh: bool,
+    x_priority: str | None,
+    force_profile: bool,
+) -> Dict[str, Any]:
+    """Body of `/analyze/{id}`, run inside the request's root span."""
+    key = cache_key(tenant, id)
+    
+    # Serve a webhook pre-scored result when one is fresh
+    cached = None if refresh else _get_prescorer().cache.get(key)
+    span.set_attribute("cache_hit", cached is not None)
+    if cached is not None:
+        http_response.headers["X-Cache"] = "hit"
+        if report_format != "markdown":
+            folio_id = (cached.get("folio") or {}).get("id", id)
+            missing_docs = cached["signals"].get("missing_docs", [])
+            report = _renderer.render(
+                folio_id,
+                cached["risk"],
+                missing_docs,
+                report_format,
+                missing_count=cached["signals"].get("missing_docs_count"),
+            )
+            cached = {**cached, "report": report}
+        logger.info(f"Serving pre-scored analysis for id={id}")
+        return cached
     
     # Initialize on first request if not already initialized (for TestClient compatibility)
-    if _graph_app is None:
-        logger.info("Lazy initialization on first request")
-        env_file = os.getenv("ENV_FILE", ".env")
-        if os.path.exists(env_file):
-            load_dotenv(env_file)
-        
-        settings = get_settings()
-        _llm = ChatOpenAI(
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,
-        )
-        _graph_app = build_app(llm=_llm)
+    try:
+        graph = _graph_for(tenant)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant {tenant!r}")
+    
+    admission = _get_admission()
+    try:
+        priority = admission.priority_for(key, x_priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    span.set_attribute("priority", priority)
     
-    logger.info(f"Analyzing risk for id={id}")
+    logger.info(f"Analyzing risk for id={id} tenant={tenant} priority={priority}")
     
     try:
         # Create initial state
-        initial_state = AnalyzerState(id=id)
-        
-        # Invoke the graph
-        result = _graph_app.invoke(initial_state)
+        initial_state = AnalyzerState(id=id, report_format=report_format)
         
-        # Convert Pydantic model to dict for JSON serialization
-        folio_dict = result["folio"].model_dump() if result.get("folio") else None
+        # Invoke the graph off the event loop once admitted
+        profiler = _get_profiler()
+        queued_at = time.perf_counter()
+        async with admission.admit(priority):
+            span.set_attribute("queue_wait_ms", round((time.perf_counter() - queued_at) * 1000, 3))
+            if profiler is not None and profiler.should_profile(forced=force_profile):
+                span.set_attribute("profiled", True)
+                # Profile inside the worker thread, where the graph actually runs
+                result = await run_in_threadpool(profiler.run, id, graph.invoke, initial_state)
+            else:
+                result = await run_in_threadpool(graph.invoke, initial_state)
+        if result.get("folio") is not None:
+            admission.note_urgency(key, result["folio"].es_urgente)
         
-        # Build response
-        response = {
-            "id": result.get("id"),
-            "folio": folio_dict,
-            "signals": result.get("signals", {}),
-            "risk": result.get("risk", {}),
-            "report": result.get("report"),
-        }
+        response = _to_response(result)
+        http_response.headers["X-Cache"] = "miss"
+        if refresh:
+            # Replace the stale pre-scored entry; cached reports are always markdown
+            _get_prescorer().cache.put(key, response if report_format == "markdown" else _as_markdown(response))
         
         logger.info(f"Analysis complete for id={id}, risk_level={result.get('risk', {}).get('level')}")
         return response
         
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Error analyzing id={id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@app.post("/tenants/{tenant}/analyze/{id}")
+async def analyze_tenant_risk(
+    tenant: str,
+    id: str,
+    http_response: Response,
+    report_format: ReportFormat = Query("markdown", alias="format"),
+    refresh: bool = Query(False),
+    x_priority: str | None = Header(None),
+    x_debug_profile: str | None = Header(None),
+    x_admin_token: str | None = Header(None),
+) -> Dict[str, Any]:
+    """Analyze risk for a folio of a specific Joget tenant (same as `/analyze/{id}` with `X-Joget-Tenant`)."""
+    return await analyze_risk(
+        id,
+        http_response,
+        report_format=report_format,
+        refresh=refresh,
+        x_priority=x_priority,
+        x_debug_profile=x_debug_profile,
+        x_admin_token=x_admin_token,
+        x_joget_tenant=tenant,
+    )
+
+
+@app.post("/events/joget", status_code=202)
+async def joget_event(event: JogetEvent, x_joget_tenant: str | None = Header(None)) -> Dict[str, Any]:
+    """
+    Ingest a Joget form save / status change and pre-score the folio in the background.
+    
+    Rapid successive events for the same folio are debounced into one analysis;
+    the result is served by `/analyze/{id}` until the next event or TTL expiry.
+    """
+    settings = get_settings()
+    tenant = event.tenant or x_joget_tenant or DEFAULT_TENANT
+    _ensure_graph()
+    if tenant != DEFAULT_TENANT and (_registry is None or tenant not in _registry.names()):
+        raise HTTPException(status_code=404, detail=f"Unknown tenant {tenant!r}")
+    key = cache_key(tenant, event.id)
+    if settings.prescore_statuses:
+        statuses = {s.strip().lower() for s in settings.prescore_statuses.split(",") if s.strip()}
+        if (event.estatus or "").lower() not in statuses:
+            _get_prescorer().cache.invalidate(key)
+            return {"id": event.id, "tenant": tenant, "status": "ignored"}
+    
+    status = _get_prescorer().submit(key)
+    logger.info(f"Joget event={event.event} id={event.id} tenant={tenant} estatus={event.estatus} -> {status}")
+    return {"id": event.id, "tenant": tenant, "status": status}
+
+
+@app.post("/simulate")
+async def simulate_rules(request: SimulationRequest) -> Dict[str, Any]:
+    """
+    Evaluate alternative heuristic rules over the stored folio feature snapshot.
+    
+    No Joget or LLM calls are made; returns the level transition matrix
+    (current rules -> proposed rules) and the affected folio IDs.
+    """
+    snapshot = await run_in_threadpool(_get_snapshot)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No simulation snapshot configured (set SIMULATION_SNAPSHOT_PATH)")
+    return await run_in_threadpool(
+        lambda: simulate(snapshot, request.rules, affected_limit=request.affected_limit)
+    )
+
+
+@app.get("/admin/profiles")
+async def profiles(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("cumtime", pattern="^(cumtime|tottime)$"),
+    x_admin_token: str | None = Header(None),
+) -> Dict[str, Any]:
+    """Aggregated hot functions across buffered request profiles (requires `X-Admin-Token`)."""
+    if not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required (set PROFILE_ADMIN_TOKEN and send X-Admin-Token)")
+    profiler = _get_profiler()
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILE_ENABLED=true)")
+    return profiler.report(limit=limit, sort=sort)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -128,5 +460,9 @@ async def root():
         "endpoints": {
             "health": "/health",
             "analyze": "/analyze/{id}",
+            "analyze_tenant": "/tenants/{tenant}/analyze/{id}",
+            "events": "/events/joget",
+            "simulate": "/simulate",
+            "profiles": "/admin/profiles",
         },
     }
@@ -0,0 +1,173 @@
+"""Process-pool backfill runner for heuristic-only (LLM-free) scoring."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+from .graph import build_app
+from .logging_setup import configure_logging
+from .replay import PayloadArchive, ReplayJogetClient
+from .schemas import AnalyzerState
+
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, populated once by `_init_worker`. The replay client reads
+# from a single-slot mapping that holds only the folio being scored.
+_worker_payloads: dict[str, dict[str, Any]] = {}
+_worker_app = None
+
+
+def _init_worker(log_level: int | None = None) -> None:
+    """Compile the graph once per worker; each record only swaps the payload slot.
+
+    Pool workers pass `log_level` to log straight to stderr: a forked child
+    inherits the parent's queue handler but not its listener thread.
+    """
+    global _worker_app
+    settings = get_settings()
+    if log_level is not None:
+        configure_logging(
+            level=log_level,
+            fmt=settings.log_format,
+            debug_sample_rate=settings.log_debug_sample_rate,
+            background=False,
+        )
+    client = ReplayJogetClient(
+        _worker_payloads,
+        max_documents=settings.joget_max_documents,
+        max_missing_names=settings.joget_max_missing_names,
+    )
+    _worker_app = build_app(llm=None, joget_client=client)
+
+
+def _score_record(line: bytes) -> dict[str, Any]:
+    folio_id = None
+    try:
+        record = json.loads(line)
+        folio_id = record["primary_key"]
+        _worker_payloads.clear()
+        _worker_payloads[folio_id] = record["payload"]
+        result = _worker_app.invoke(AnalyzerState(id=folio_id))
+        return {
+            "id": folio_id,
+            "signals": result.get("signals", {}),
+            "risk": result.get("risk", {}),
+            "report": result.get("report"),
+        }
+    except Exception as e:  # one bad folio must not sink the whole chunk
+        return {"id": folio_id, "error": f"{type(e).__name__}: {e}"}
+
+
+def _score_chunk(blob: bytes) -> bytes:
+    """Score a newline-joined blob of archive records and return the results as one JSONL blob.
+
+    Records are scored in position, so duplicate ids each keep their own
+    payload. Shipping raw bytes both ways keeps the pickling cost flat instead
+    of paying for a nested dict graph per folio.
+    """
+    if _worker_app is None:
+        _init_worker()
+    lines = [
+        json.dumps(_score_record(line), ensure_ascii=False, separators=(",", ":"), default=str)
+        for line in blob.split(b"\n")
+    ]
+    return "\n".join(lines).encode("utf-8")
+
+
+def _chunked(records: Iterable[bytes], size: int) -> Iterator[bytes]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield b"\n".join(chunk)
+
+
+def run_backfill(
+    records: Iterable[bytes],
+    *,
+    workers: int | None = None,
+    chunk_size: int = 256,
+) -> Iterator[dict[str, Any]]:
+    """Score archive records across a process pool, yielding results in input order.
+
+    Each record is one undecoded `PayloadRecorder` line (see
+    `PayloadArchive.raw`); it is only parsed inside the worker. Failed folios
+    yield `{"id": ..., "error": ...}` instead of raising.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(records, chunk_size)
+    logger.info(f"Starting backfill with workers={workers} chunk_size={chunk_size}")
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _decode_blob(_score_chunk(chunk))
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    ) as executor:
+        # Executor.map submits every chunk up front; bound in-flight work so
+        # huge inputs are streamed rather than buffered in the parent.
+        window = workers * 2
+        pending: deque[Future[bytes]] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_chunk, chunk))
+            if len(pending) >= window:
+                yield from _decode_blob(pending.popleft().result())
+        for future in pending:
+            yield from _decode_blob(future.result())
+
+
+def _decode_blob(blob: bytes) -> Iterator[dict[str, Any]]:
+    # Split on b"\n" only: str.splitlines() would also break on U+2028/U+2029/U+0085,
+    # which ensure_ascii=False leaves unescaped inside string values
+    for line in blob.split(b"\n"):
+        yield json.loads(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Heuristic-only backfill over recorded Joget payloads")
+    parser.add_argument("--input", type=Path, required=True, help="Payload archive written by PayloadRecorder")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Folios per worker task")
+    parser.add_argument("--debug", action="store_true", help="Enable DEBUG logging")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings = get_settings()
+    log_listener = configure_logging(
+        level=logging.DEBUG if args.debug else settings.log_level.upper(),
+        fmt=settings.log_format,
+        debug_sample_rate=settings.log_debug_sample_rate,
+    )
+    try:
+        errors = 0
+        total = 0
+        with PayloadArchive(args.input) as archive, open(args.output, "w", encoding="utf-8") as out:
+            records = (archive.raw(key) for key in archive)
+            for record in run_backfill(records, workers=args.workers, chunk_size=args.chunk_size):
+                total += 1
+                errors += "error" in record
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info(f"Backfill complete: {total} folios, {errors} errors -> {args.output}")
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,44 @@ class Settings(BaseModel):
 
     model_config = ConfigDict(populate_by_name=True, case_sensitive=False)
 
-    joget_base_url: str = Field(alias="JOGET_BASE_URL")
-    joget_username: str = Field(alias="JOGET_USERNAME")
-    joget_password: str = Field(alias="JOGET_PASSWORD")
-    joget_app_id: str = Field(alias="JOGET_APP_ID")
-    joget_tramite_form_id: str = Field(alias="JOGET_TRAMITE_FORM_ID")
+    # Only required once a live JogetClient is built, so replay/offline tools run without them
+    joget_base_url: str | None = Field(default=None, alias="JOGET_BASE_URL")
+    joget_username: str | None = Field(default=None, alias="JOGET_USERNAME")
+    joget_password: str | None = Field(default=None, alias="JOGET_PASSWORD")
+    joget_app_id: str | None = Field(default=None, alias="JOGET_APP_ID")
+    joget_tramite_form_id: str | None = Field(default=None, alias="JOGET_TRAMITE_FORM_ID")
+    joget_tenants: str | None = Field(default=None, alias="JOGET_TENANTS")
+    joget_tenants_file: str | None = Field(default=None, alias="JOGET_TENANTS_FILE")
+    joget_max_payload_bytes: int = Field(default=16 * 1024 * 1024, alias="JOGET_MAX_PAYLOAD_BYTES")
+    joget_max_documents: int = Field(default=200, alias="JOGET_MAX_DOCUMENTS")
+    joget_max_missing_names: int = Field(default=50, alias="JOGET_MAX_MISSING_NAMES")
     llm_model: str = Field(default="gpt-4o-mini", alias="LLM_MODEL")
     llm_temperature: float = Field(default=0.0, alias="LLM_TEMPERATURE")
+    llm_requests_per_minute: float | None = Field(default=None, alias="LLM_REQUESTS_PER_MINUTE")
+    llm_tokens_per_minute: float | None = Field(default=None, alias="LLM_TOKENS_PER_MINUTE")
+    llm_completion_tokens: int = Field(default=512, alias="LLM_COMPLETION_TOKENS")
+    llm_payload_fields: str | None = Field(default=None, alias="LLM_PAYLOAD_FIELDS")
+    llm_payload_top_missing: int = Field(default=10, alias="LLM_PAYLOAD_TOP_MISSING")
+    log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    log_format: str = Field(default="text", alias="LOG_FORMAT")
+    log_debug_sample_rate: float = Field(default=1.0, alias="LOG_DEBUG_SAMPLE_RATE")
+    profile_enabled: bool = Field(default=False, alias="PROFILE_ENABLED")
+    profile_sample_rate: float = Field(default=0.0, alias="PROFILE_SAMPLE_RATE")
+    profile_buffer_size: int = Field(default=50, alias="PROFILE_BUFFER_SIZE")
+    profile_trace_memory: bool = Field(default=True, alias="PROFILE_TRACE_MEMORY")
+    # Required by /admin/profiles and X-Debug-Profile; both stay closed while unset
+    profile_admin_token: str | None = Field(default=None, alias="PROFILE_ADMIN_TOKEN")
+    prescore_debounce_seconds: float = Field(default=2.0, alias="PRESCORE_DEBOUNCE_SECONDS")
+    prescore_cache_ttl_seconds: float = Field(default=900.0, alias="PRESCORE_CACHE_TTL_SECONDS")
+    prescore_cache_size: int = Field(default=10_000, alias="PRESCORE_CACHE_SIZE")
+    prescore_statuses: str | None = Field(default=None, alias="PRESCORE_STATUSES")
+    tracing_exporter: str = Field(default="none", alias="TRACING_EXPORTER")
+    tracing_jsonl_path: str = Field(default="traces.jsonl", alias="TRACING_JSONL_PATH")
+    tracing_sample_rate: float = Field(default=1.0, alias="TRACING_SAMPLE_RATE")
+    simulation_snapshot_path: str | None = Field(default=None, alias="SIMULATION_SNAPSHOT_PATH")
+    admission_max_concurrency: int = Field(default=8, alias="ADMISSION_MAX_CONCURRENCY")
+    admission_max_queue: int = Field(default=64, alias="ADMISSION_MAX_QUEUE")
+    admission_retry_after: int = Field(default=2, alias="ADMISSION_RETRY_AFTER")
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,123 @@
+"""Single-pass parsing of Joget documents grids with bounded materialization."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Iterable, Iterator
+
+from .schemas import DocumentSummary, TramiteDocument, TramiteFolio
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DOCUMENTS = 200
+DEFAULT_MAX_MISSING_NAMES = 50
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def parse_checkbox(value: Any) -> bool:
+    """Convert a Joget checkbox value ("on", "true", ...) to a boolean."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ("on", "true", "1", "yes")
+    return False
+
+
+def _skip_whitespace(text: str, idx: int) -> int:
+    while idx < len(text) and text[idx] in _WHITESPACE:
+        idx += 1
+    return idx
+
+
+def iter_grid_rows(raw: Any) -> Iterator[Any]:
+    """Yield grid rows one at a time.
+
+    Joget returns the grid as a JSON array *string*; it is decoded element by
+    element so the rows never exist as one list. Lists are iterated as-is and
+    any other value yields nothing. Malformed strings raise `ValueError`.
+    """
+    if isinstance(raw, (list, tuple)):
+        yield from raw
+        return
+    if not isinstance(raw, str):
+        return
+
+    idx = _skip_whitespace(raw, 0)
+    if idx >= len(raw) or raw[idx] != "[":
+        raise ValueError("documents grid is not a JSON array")
+    idx = _skip_whitespace(raw, idx + 1)
+    if idx < len(raw) and raw[idx] == "]":
+        return
+    while True:
+        row, idx = _DECODER.raw_decode(raw, idx)
+        yield row
+        idx = _skip_whitespace(raw, idx)
+        if idx >= len(raw):
+            raise ValueError("documents grid is not terminated")
+        if raw[idx] == "]":
+            return
+        if raw[idx] != ",":
+            raise ValueError(f"unexpected {raw[idx]!r} in documents grid at offset {idx}")
+        idx = _skip_whitespace(raw, idx + 1)
+
+
+def parse_documents(
+    raw: Any,
+    *,
+    max_documents: int = DEFAULT_MAX_DOCUMENTS,
+    max_missing_names: int = DEFAULT_MAX_MISSING_NAMES,
+) -> tuple[list[TramiteDocument], DocumentSummary]:
+    """Parse a documents grid in one pass.
+
+    Counts cover every row, but only the first `max_documents` rows become
+    `TramiteDocument` models and only the first `max_missing_names` missing
+    names are kept. An unparseable grid is treated as empty.
+    """
+    documents: list[TramiteDocument] = []
+    summary = DocumentSummary()
+    try:
+        for row in iter_grid_rows(raw):
+            if not isinstance(row, dict):
+                continue
+            required = parse_checkbox(row.get("required"))
+            uploaded = parse_checkbox(row.get("uploaded"))
+            name = str(row.get("name", "unknown"))
+            _count(summary, name, required, uploaded, max_missing_names)
+            if len(documents) < max_documents:
+                documents.append(TramiteDocument(name=name, required=required, uploaded=uploaded))
+    except ValueError as e:
+        logger.warning("Ignoring malformed documents grid: %s", e)
+        return [], DocumentSummary()
+
+    if summary.total > len(documents):
+        logger.debug("Documents grid truncated: kept %d of %d rows", len(documents), summary.total)
+    return documents, summary
+
+
+def summarize(documents: Iterable[TramiteDocument], *, max_missing_names: int = DEFAULT_MAX_MISSING_NAMES) -> DocumentSummary:
+    """Summarize already materialized documents."""
+    summary = DocumentSummary()
+    for doc in documents:
+        _count(summary, doc.name, doc.required, doc.uploaded, max_missing_names)
+    return summary
+
+
+def document_summary(folio: TramiteFolio) -> DocumentSummary:
+    """Return the summary computed at hydration, or derive one from `folio.documents`."""
+    if folio.document_summary is not None:
+        return folio.document_summary
+    return summarize(folio.documents)
+
+
+def _count(summary: DocumentSummary, name: str, required: bool, uploaded: bool, max_missing_names: int) -> None:
+    summary.total += 1
+    summary.required += required
+    summary.uploaded += uploaded
+    if required and not uploaded:
+        summary.missing += 1
+        if len(summary.missing_names) < max_missing_names:
+            summary.missing_names.append(name)
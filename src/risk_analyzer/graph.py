@@ -11,13 +11,19 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable
 from langgraph.graph import END, StateGraph
 
+from . import tracing
+from .documents import document_summary
 from .joget_adapter import JogetClient
+from .prompt_payload import LLMPayloadBuilder
+from .ratelimit import LLMRateLimiter, estimate_tokens
+from .reporting import ReportRenderer
 from .schemas import AnalyzerState, RiskAssessment
-from .scoring import heuristic_score
+from .scoring import heuristic_score, risk_level
 
 
 logger = logging.getLogger(__name__)
 PromptFactory = Callable[[], ChatPromptTemplate]
+Node = Callable[[AnalyzerState], dict[str, Any]]
 
 
 def build_app(
@@ -25,58 +31,74 @@ def build_app(
     llm: Runnable | None = None,
     joget_client: JogetClient | None = None,
     prompt_factory: PromptFactory | None = None,
+    report_renderer: ReportRenderer | None = None,
+    rate_limiter: LLMRateLimiter | None = None,
+    payload_builder: LLMPayloadBuilder | None = None,
 ):
     """Create and compile the LangGraph application."""
 
     client = joget_client or JogetClient()
     prompt = prompt_factory() if prompt_factory else _default_prompt()
+    renderer = report_renderer or ReportRenderer()
+    builder = payload_builder or LLMPayloadBuilder()
+    llm_chain = llm | StrOutputParser() if llm is not None else None
 
     def fetch_tramite(state: AnalyzerState) -> dict[str, Any]:
-        logger.info(f"fetch_tramite: Loading id={state.id}")
+        extra = {"folio": state.id}
+        logger.info("fetch_tramite: Loading id=%s", state.id, extra=extra)
         folio = client.fetch_tramite(state.id)
-        logger.debug(f"fetch_tramite: Received folio={folio.id}, ramo={folio.ramo}, prima={folio.monto_prima}")
+        logger.debug("fetch_tramite: Received folio=%s, ramo=%s, prima=%s", folio.id, folio.ramo, folio.monto_prima, extra=extra)
         
+        summary = document_summary(folio)
+        tracing.current_span().set_attributes(documents=summary.total, missing_docs=summary.missing)
         signals = {
-            "missing_docs": [doc.name for doc in folio.documents if doc.required and not doc.uploaded],
+            "missing_docs": summary.missing_names,
+            "missing_docs_count": summary.missing,
             "ramo": folio.ramo,
             "requiere_reaseguro": folio.requiere_reaseguro,
         }
-        logger.debug(f"fetch_tramite: Extracted signals={signals}")
+        logger.debug("fetch_tramite: Extracted signals=%s", signals, extra=extra)
         return {"folio": folio, "signals": signals}
 
     def enrich_context(state: AnalyzerState) -> dict[str, Any]:
-        logger.info("enrich_context: Enriching signals with additional context")
+        extra = {"folio": state.id}
+        logger.info("enrich_context: Enriching signals with additional context", extra=extra)
         signals = dict(state.signals)
         if state.folio and state.folio.catalog_line:
             signals["catalog_line"] = state.folio.catalog_line
-            logger.debug(f"enrich_context: Added catalog_line={state.folio.catalog_line}")
+            logger.debug("enrich_context: Added catalog_line=%s", state.folio.catalog_line, extra=extra)
         if state.folio and state.folio.estatus:
             signals["estatus"] = state.folio.estatus
-            logger.debug(f"enrich_context: Added estatus={state.folio.estatus}")
-        logger.debug(f"enrich_context: Final signals={signals}")
+            logger.debug("enrich_context: Added estatus=%s", state.folio.estatus, extra=extra)
+        logger.debug("enrich_context: Final signals=%s", signals, extra=extra)
         return {"signals": signals}
 
     def score_risk(state: AnalyzerState) -> dict[str, Any]:
         assert state.folio, "Folio data missing before scoring"
-        logger.info(f"score_risk: Calculating risk for folio={state.folio.id}")
+        extra = {"folio": state.id}
+        logger.info("score_risk: Calculating risk for folio=%s", state.folio.id, extra=extra)
         
         assessment = heuristic_score(state.folio, signals=state.signals)
-        logger.debug(f"score_risk: Heuristic baseline score={assessment.score:.2f}, level={assessment.level}")
+        logger.debug("score_risk: Heuristic baseline score=%.2f, level=%s", assessment.score, assessment.level, extra=extra)
         
         delta = 0.0
+        prompt_tokens = 0
         rationale = assessment.rationale
         recommendations = list(assessment.recommendations)
 
         if llm is not None:
-            logger.debug("score_risk: Calling LLM for adjustment")
-            llm_payload = {
-                "folio": state.folio.model_dump(),
-                "signals": state.signals,
-                "baseline": assessment.model_dump(),
-            }
-            llm_chain = prompt | llm | StrOutputParser()
-            raw = llm_chain.invoke(llm_payload)
-            logger.debug(f"score_risk: LLM raw response: {raw[:200]}...")
+            logger.debug("score_risk: Calling LLM for adjustment", extra=extra)
+            llm_payload = builder.build(state.folio, state.signals, assessment)
+            prompt_value = prompt.invoke(llm_payload)
+            prompt_tokens = estimate_tokens(prompt_value.to_string())
+            logger.info("score_risk: Prompt for folio=%s is ~%d tokens", state.folio.id, prompt_tokens, extra=extra)
+            if rate_limiter is not None:
+                with tracing.span("llm.rate_limit", prompt_tokens=prompt_tokens):
+                    rate_limiter.acquire(prompt_tokens)
+            with tracing.span("llm", folio_id=state.id, prompt_tokens=prompt_tokens) as llm_span:
+                raw = llm_chain.invoke(prompt_value)
+                llm_span.set_attribute("response_chars", len(raw))
+            logger.debug("score_risk: LLM raw response: %.200s...", raw, extra=extra)
             
             try:
                 # Strip markdown code fences if present
@@ -93,16 +115,22 @@ def build_app(
                 delta = float(parsed.get("delta", 0.0))
                 rationale = parsed.get("rationale", rationale)
                 recommendations.extend(parsed.get("recommendations", []))
-                logger.debug(f"score_risk: LLM delta={delta:.2f}, added {len(parsed.get('recommendations', []))} recommendations")
+                logger.debug(
+                    "score_risk: LLM delta=%.2f, added %d recommendations",
+                    delta,
+                    len(parsed.get("recommendations", [])),
+                    extra=extra,
+                )
             except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
-                logger.warning(f"score_risk: LLM response parsing failed: {type(e).__name__}: {e}")
+                logger.warning("score_risk: LLM response parsing failed: %s: %s", type(e).__name__, e, extra=extra)
                 recommendations.append("LLM no devolvió JSON válido; se conserva baseline")
         else:
-            logger.debug("score_risk: No LLM configured, using heuristic score only")
+            logger.debug("score_risk: No LLM configured, using heuristic score only", extra=extra)
             
         final_score = max(0.0, min(1.0, assessment.score + delta))
-        level = "alto" if final_score >= 0.7 else "medio" if final_score >= 0.4 else "bajo"
-        logger.info(f"score_risk: Final score={final_score:.2f}, level={level} (delta={delta:.2f})")
+        level = risk_level(final_score)
+        logger.info("score_risk: Final score=%.2f, level=%s (delta=%.2f)", final_score, level, delta, extra=extra)
+        tracing.current_span().set_attributes(score=final_score, level=level, llm_delta=delta)
         
         risk = RiskAssessment(
             score=final_score,
@@ -115,47 +143,32 @@ def build_app(
                 **risk.model_dump(),
                 "baseline_score": assessment.score,
                 "llm_delta": delta,
+                "prompt_tokens": prompt_tokens,
             }
         }
 
     def render_report(state: AnalyzerState) -> dict[str, Any]:
         assert state.folio and state.risk
-        logger.info(f"render_report: Generating report for folio={state.folio.id}")
-        
-        risk = RiskAssessment.model_validate(state.risk)
-        baseline_score = state.risk.get("baseline_score", risk.score)
-        llm_delta = state.risk.get("llm_delta", 0.0)
+        extra = {"folio": state.id}
+        logger.info("render_report: Generating %s report for folio=%s", state.report_format, state.folio.id, extra=extra)
         
+        tracing.current_span().set_attribute("format", state.report_format)
         missing_docs = state.signals.get("missing_docs", [])
-        logger.debug(f"render_report: Risk level={risk.level}, missing_docs={len(missing_docs)}, recommendations={len(risk.recommendations)}")
-        
-        # Build score breakdown
-        score_breakdown = f"**{risk.level.upper()}** ({risk.score:.2f})"
-        if llm_delta != 0.0:
-            score_breakdown += f" [Heurístico: {baseline_score:.2f} + LLM: {llm_delta:+.2f}]"
-        else:
-            score_breakdown += f" [Heurístico: {baseline_score:.2f}]"
-        
-        report = [
-            f"Folio **{state.folio.id}**",
-            f"Nivel de riesgo: {score_breakdown}",
-            f"Motivo: {risk.rationale}",
-        ]
-        if missing_docs:
-            report.append(f"Documentos faltantes: {', '.join(missing_docs)}")
-        if risk.recommendations:
-            report.append("Recomendaciones:")
-            for item in risk.recommendations:
-                report.append(f"- {item}")
-        
-        logger.debug(f"render_report: Report has {len(report)} lines")
-        return {"report": "\n".join(report)}
+        report = renderer.render(
+            state.folio.id,
+            state.risk,
+            missing_docs,
+            state.report_format,
+            missing_count=state.signals.get("missing_docs_count"),
+        )
+        logger.debug("render_report: Renderer cache hits=%d misses=%d", renderer.hits, renderer.misses, extra=extra)
+        return {"report": report}
 
     graph = StateGraph(AnalyzerState)
-    graph.add_node("fetch_tramite", fetch_tramite)
-    graph.add_node("enrich_context", enrich_context)
-    graph.add_node("score_risk", score_risk)
-    graph.add_node("render_report", render_report)
+    graph.add_node("fetch_tramite", _traced("fetch_tramite", fetch_tramite))
+    graph.add_node("enrich_context", _traced("enrich_context", enrich_context))
+    graph.add_node("score_risk", _traced("score_risk", score_risk))
+    graph.add_node("render_report", _traced("render_report", render_report))
 
     graph.set_entry_point("fetch_tramite")
     graph.add_edge("fetch_tramite", "enrich_context")
@@ -167,6 +180,17 @@ def build_app(
     return graph.compile()
 
 
+def _traced(name: str, node: Node) -> Node:
+    """Run a graph node inside a span named after it."""
+
+    def run(state: AnalyzerState) -> dict[str, Any]:
+        with tracing.span(name, folio_id=state.id):
+            return node(state)
+
+    run.__name__ = name
+    return run
+
+
 def _default_prompt() -> ChatPromptTemplate:
     return ChatPromptTemplate.from_messages(
         [
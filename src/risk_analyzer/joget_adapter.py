@@ -4,16 +4,23 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from . import tracing
 from .config import get_settings
-from .schemas import TramiteDocument, TramiteFolio
+from .documents import DEFAULT_MAX_DOCUMENTS, DEFAULT_MAX_MISSING_NAMES, parse_checkbox, parse_documents
+from .schemas import TramiteFolio
+
+if TYPE_CHECKING:
+    from .replay import PayloadRecorder
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_PAYLOAD_BYTES = 16 * 1024 * 1024
+
 
 class JogetError(RuntimeError):
     """Raised when Joget DX responds with an unexpected payload."""
@@ -22,12 +29,52 @@ class JogetError(RuntimeError):
 class JogetClient:
     """Thin wrapper around Joget DX JSON API."""
 
-    def __init__(self, *, base_url: str | None = None, username: str | None = None, password: str | None = None):
-        settings = get_settings()
-        self._base_url = base_url or settings.joget_base_url.rstrip("/")
-        self._username = username or settings.joget_username
-        self._password = password or settings.joget_password
-        self._session = httpx.Client(timeout=30.0)  # Increased timeout to 30s
+    def __init__(
+        self,
+        *,
+        base_url: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        app_id: str | None = None,
+        tramite_form_id: str | None = None,
+        max_connections: int = 20,
+        max_payload_bytes: int | None = None,
+        max_documents: int | None = None,
+        max_missing_names: int | None = None,
+        recorder: PayloadRecorder | None = None,
+    ):
+        # Fully specified clients (e.g. per-tenant ones) don't depend on the global settings
+        explicit = (base_url, username, password, app_id, tramite_form_id)
+        settings = None if all(explicit) else get_settings()
+        resolved = {
+            "JOGET_BASE_URL": base_url or settings.joget_base_url,
+            "JOGET_USERNAME": username or settings.joget_username,
+            "JOGET_PASSWORD": password or settings.joget_password,
+            "JOGET_APP_ID": app_id or settings.joget_app_id,
+            "JOGET_TRAMITE_FORM_ID": tramite_form_id or settings.joget_tramite_form_id,
+        }
+        missing = [name for name, value in resolved.items() if not value]
+        if missing:
+            raise ValueError(f"Joget is not configured; set {', '.join(missing)}")
+        self._base_url = resolved["JOGET_BASE_URL"].rstrip("/")
+        self._username = resolved["JOGET_USERNAME"]
+        self._password = resolved["JOGET_PASSWORD"]
+        self._app_id = resolved["JOGET_APP_ID"]
+        self._form_id = resolved["JOGET_TRAMITE_FORM_ID"]
+        self._max_payload_bytes = max_payload_bytes or (
+            settings.joget_max_payload_bytes if settings else DEFAULT_MAX_PAYLOAD_BYTES
+        )
+        self._max_documents = max_documents if max_documents is not None else (
+            settings.joget_max_documents if settings else DEFAULT_MAX_DOCUMENTS
+        )
+        self._max_missing_names = max_missing_names if max_missing_names is not None else (
+            settings.joget_max_missing_names if settings else DEFAULT_MAX_MISSING_NAMES
+        )
+        self._recorder = recorder
+        self._session = httpx.Client(
+            timeout=30.0,  # Increased timeout to 30s
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
 
     def _auth(self) -> tuple[str, str]:
         return (self._username, self._password)
@@ -36,68 +83,86 @@ class JogetClient:
         """Fetch form data using Joget's JSON API."""
 
         url = f"{self._base_url}/web/json/data/form/load/{app_id}/{form_id}/{primary_key}"
-        logger.debug(f"Joget GET: {url} (user={self._username})")
+        extra = {"folio": primary_key}
+        logger.debug("Joget GET: %s (user=%s)", url, self._username, extra=extra)
         
-        try:
-            response = self._session.get(url, auth=self._auth())
-            logger.debug(f"Joget response: status={response.status_code}")
-        except httpx.ReadError as e:
-            logger.error(f"Joget connection error: {e}")
-            raise JogetError(f"Failed to connect to Joget at {url}: {e}") from e
-        except httpx.TimeoutException as e:
-            logger.error(f"Joget timeout: {e}")
-            raise JogetError(f"Joget request timed out at {url}: {e}") from e
+        with tracing.span("joget.http", folio_id=primary_key, app_id=app_id, form_id=form_id) as span:
+            try:
+                # Streamed so oversized payloads are rejected before they are buffered
+                with self._session.stream("GET", url, auth=self._auth()) as response:
+                    logger.debug("Joget response: status=%d", response.status_code, extra=extra)
+                    span.set_attribute("status_code", response.status_code)
+                    body = self._read_body(response, url)
+            except httpx.ReadError as e:
+                logger.error("Joget connection error: %s", e, extra=extra)
+                raise JogetError(f"Failed to connect to Joget at {url}: {e}") from e
+            except httpx.TimeoutException as e:
+                logger.error("Joget timeout: %s", e, extra=extra)
+                raise JogetError(f"Joget request timed out at {url}: {e}") from e
+            span.set_attribute("bytes", len(body))
         
         if response.status_code >= 400:
-            logger.error(f"Joget HTTP error {response.status_code}: {response.text[:200]}")
-            raise JogetError(f"Joget returned {response.status_code}: {response.text}")
+            text = body.decode("utf-8", errors="replace")
+            logger.error("Joget HTTP error %d: %.200s", response.status_code, text, extra=extra)
+            raise JogetError(f"Joget returned {response.status_code}: {text}")
         try:
-            payload = response.json()
-            logger.debug(f"Joget returned {len(payload)} fields")
-        except json.JSONDecodeError as exc:
-            logger.error(f"Joget returned invalid JSON: {response.text[:200]}")
+            payload = json.loads(body)
+            logger.debug("Joget returned %d fields (%d bytes)", len(payload), len(body), extra=extra)
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            logger.error("Joget returned invalid JSON: %.200s", body.decode("utf-8", errors="replace"), extra=extra)
             raise JogetError("Joget response is not valid JSON") from exc
+        if self._recorder is not None:
+            self._recorder.record(app_id, form_id, primary_key, payload)
         return payload
 
+    def _read_body(self, response: httpx.Response, url: str) -> bytearray:
+        """Read the response body, failing once it exceeds `max_payload_bytes`."""
+        limit = self._max_payload_bytes
+        declared = response.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > limit:
+            raise JogetError(f"Joget payload at {url} is {declared} bytes (limit {limit})")
+        body = bytearray()
+        for chunk in response.iter_bytes():
+            body += chunk
+            if len(body) > limit:
+                raise JogetError(f"Joget payload at {url} exceeds {limit} bytes")
+        return body
+
     def fetch_tramite(self, id: str) -> TramiteFolio:
         """Hydrate a `TramiteFolio` model from Joget form data."""
 
-        settings = get_settings()
-        raw = self.get_form_data(settings.joget_app_id, settings.joget_tramite_form_id, id)
-        
-        # Parse documents: Joget returns it as a JSON string
-        documents_raw = raw.get("documents", [])
-        if isinstance(documents_raw, str):
-            try:
-                documents_raw = json.loads(documents_raw)
-            except (json.JSONDecodeError, TypeError):
-                documents_raw = []
-        
-        documents = [
-            TramiteDocument(
-                name=doc.get("name", "unknown"),
-                required=self._parse_checkbox(doc.get("required")),
-                uploaded=self._parse_checkbox(doc.get("uploaded")),
-            )
-            for doc in documents_raw if isinstance(doc, dict)
-        ]
+        raw = self.get_form_data(self._app_id, self._form_id, id)
+        return self.hydrate_tramite(raw, max_documents=self._max_documents, max_missing_names=self._max_missing_names)
+
+    @classmethod
+    def hydrate_tramite(
+        cls,
+        raw: dict[str, Any],
+        *,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        max_missing_names: int = DEFAULT_MAX_MISSING_NAMES,
+    ) -> TramiteFolio:
+        """Build a `TramiteFolio` from a raw Joget form payload."""
+
+        # Parse documents (a JSON string from the form grid) row by row: counts
+        # cover the whole grid, only the first `max_documents` rows and
+        # `max_missing_names` missing names are kept
+        documents, summary = parse_documents(
+            raw.get("documents", []),
+            max_documents=max_documents,
+            max_missing_names=max_missing_names,
+        )
         
         # Convert checkbox strings ("on" -> True, None -> False)
         return TramiteFolio.model_validate({
             **raw,
             "documents": documents,
-            "requiere_reaseguro": self._parse_checkbox(raw.get("requiere_reaseguro")),
-            "es_urgente": self._parse_checkbox(raw.get("es_urgente")),
+            "document_summary": summary,
+            "requiere_reaseguro": cls._parse_checkbox(raw.get("requiere_reaseguro")),
+            "es_urgente": cls._parse_checkbox(raw.get("es_urgente")),
         })
 
-    @staticmethod
-    def _parse_checkbox(value: Any) -> bool:
-        """Convert Joget checkbox value to boolean."""
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ("on", "true", "1", "yes")
-        return False
+    _parse_checkbox = staticmethod(parse_checkbox)
 
 
     def close(self) -> None:
@@ -13,6 +13,11 @@ from langchain_openai import ChatOpenAI
 
 from .config import get_settings
 from .graph import build_app
+from .logging_setup import configure_logging
+from .prompt_payload import LLMPayloadBuilder
+from .ratelimit import get_rate_limiter
+from .joget_adapter import JogetClient
+from .replay import PayloadRecorder, ReplayJogetClient
 from .schemas import AnalyzerState
 
 
@@ -20,12 +25,22 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="LangGraph Joget risk analyzer")
     parser.add_argument("--id", required=True, help="Trámite folio identifier")
     parser.add_argument("--json", action="store_true", help="Print JSON payload instead of Markdown")
+    parser.add_argument(
+        "--format",
+        choices=["markdown", "text", "html"],
+        default="markdown",
+        help="Report output format",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable DEBUG logging")
+    parser.add_argument("--log-json", action="store_true", help="Emit logs as JSON lines")
     parser.add_argument(
         "--env-file",
         default=Path(".env"),
         help="Path to .env file with Joget/LLM credentials",
     )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--record", type=Path, help="Append raw Joget payloads to this JSONL(.gz) archive")
+    source.add_argument("--replay", type=Path, help="Serve Joget payloads from this archive instead of HTTP")
     return parser.parse_args()
 
 
@@ -34,11 +49,7 @@ def main() -> None:
     
     # Configure logging based on --debug flag
     log_level = logging.DEBUG if args.debug else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s [%(levelname)8s] %(name)s - %(message)s",
-        datefmt="%H:%M:%S",
-    )
+    configure_logging(level=log_level, fmt="json" if args.log_json else "text", background=False)
     logger = logging.getLogger(__name__)
     
     logger.info(f"Starting risk analyzer for id={args.id}")
@@ -47,16 +58,39 @@ def main() -> None:
     
     load_dotenv(args.env_file)
 
+    # Joget settings are optional here: --replay runs without any JOGET_* configuration
     settings = get_settings()
-    logger.debug(f"Loaded settings: base_url={settings.joget_base_url}, app_id={settings.joget_app_id}")
     
     llm = ChatOpenAI(model=settings.llm_model, temperature=settings.llm_temperature)
     logger.debug(f"Initialized LLM: {settings.llm_model} (temperature={settings.llm_temperature})")
     
-    app = build_app(llm=llm)
+    recorder = None
+    if args.replay:
+        client = ReplayJogetClient(
+            args.replay,
+            max_documents=settings.joget_max_documents,
+            max_missing_names=settings.joget_max_missing_names,
+        )
+        logger.info(f"Replaying Joget payloads from {args.replay}")
+    else:
+        logger.debug(f"Loaded settings: base_url={settings.joget_base_url}, app_id={settings.joget_app_id}")
+        recorder = PayloadRecorder(args.record) if args.record else None
+        client = JogetClient(recorder=recorder)
+
+    app = build_app(
+        llm=llm,
+        joget_client=client,
+        rate_limiter=get_rate_limiter(),
+        payload_builder=LLMPayloadBuilder.from_settings(settings),
+    )
     logger.debug("Built LangGraph app")
     
-    result = app.invoke(AnalyzerState(id=args.id))
+    try:
+        result = app.invoke(AnalyzerState(id=args.id, report_format=args.format))
+    finally:
+        client.close()
+        if recorder is not None:
+            recorder.close()
     logger.info("Analysis complete")
 
     if args.json:
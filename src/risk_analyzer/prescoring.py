@@ -0,0 +1,137 @@
+"""Background pre-scoring driven by Joget form events."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Bounded LRU of analysis responses with a time-to-live."""
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PrescoreScheduler:
+    """Debounce and deduplicate background analyses per folio.
+
+    A burst of saves for the same folio collapses into one analysis that runs
+    `debounce_seconds` after the last event. An event that arrives while that
+    folio is already being analyzed schedules exactly one follow-up run, so
+    the cached result always reflects the latest save.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str], Awaitable[dict[str, Any]]],
+        cache: ResultCache,
+        *,
+        debounce_seconds: float = 2.0,
+    ):
+        self._run = run
+        self.cache = cache
+        self.debounce_seconds = debounce_seconds
+        self._pending: dict[str, asyncio.Task] = {}
+        self._running: set[str] = set()
+        self._inflight: set[asyncio.Task] = set()
+        self._dirty: set[str] = set()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, key: str) -> str:
+        """Register a change event for `key`; returns what happened to it."""
+        # Whatever we had cached is now stale
+        self.cache.invalidate(key)
+
+        if key in self._running:
+            self._dirty.add(key)
+            return "queued"
+        status = "scheduled"
+        task = self._pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+            status = "debounced"
+        task = asyncio.get_running_loop().create_task(self._fire(key))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        self._pending[key] = task
+        return status
+
+    async def _fire(self, key: str) -> None:
+        await asyncio.sleep(self.debounce_seconds)
+        self._pending.pop(key, None)
+        self._running.add(key)
+        try:
+            result = await self._run(key)
+        except Exception as e:
+            self.failed += 1
+            logger.warning("Prescoring failed for %s: %s: %s", key, type(e).__name__, e, extra={"folio": key})
+        else:
+            if key not in self._dirty:
+                self.cache.put(key, result)
+            self.completed += 1
+            logger.info("Prescored %s", key, extra={"folio": key})
+        finally:
+            self._running.discard(key)
+        if key in self._dirty:
+            self._dirty.discard(key)
+            self.submit(key)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "running": len(self._running),
+            "cached": len(self.cache),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def drain(self) -> None:
+        """Wait until no analysis is pending or running."""
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def cancel_all(self) -> None:
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
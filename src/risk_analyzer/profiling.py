@@ -0,0 +1,163 @@
+"""Opt-in per-request profiling with cProfile and tracemalloc."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# Source files whose functions are reported as their own component
+COMPONENTS = {
+    "graph.py": "graph",
+    "joget_adapter.py": "joget_adapter",
+    "scoring.py": "scoring",
+}
+
+FunctionKey = tuple[str, int, str]
+
+
+@dataclass
+class ProfileRecord:
+    """One profiled request: per-function call stats plus optional allocation hot spots."""
+
+    folio_id: str
+    started_at: float
+    duration_ms: float
+    functions: dict[FunctionKey, tuple[int, float, float]]
+    peak_memory_kb: float | None = None
+    top_allocations: list[dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "folio_id": self.folio_id,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "peak_memory_kb": self.peak_memory_kb,
+            "top_allocations": self.top_allocations,
+        }
+
+
+def component_for(filename: str) -> str | None:
+    normalized = filename.replace("\\", "/")
+    if "/risk_analyzer/" not in normalized:
+        return None
+    return COMPONENTS.get(normalized.rsplit("/", 1)[-1])
+
+
+class RequestProfiler:
+    """Profile a sampled fraction of requests into a bounded ring buffer.
+
+    cProfile and tracemalloc are process-wide, so only one request is profiled
+    at a time; concurrent sampled requests simply run unprofiled.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 0.0,
+        capacity: int = 50,
+        trace_memory: bool = True,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.trace_memory = trace_memory
+        self._records: deque[ProfileRecord] = deque(maxlen=capacity)
+        self._busy = threading.Lock()
+        self._rng = rng
+
+    def should_profile(self, forced: bool = False) -> bool:
+        return forced or (self.sample_rate > 0 and self._rng() < self.sample_rate)
+
+    def run(self, folio_id: str, fn: Callable[..., T], *args: Any) -> T:
+        """Call `fn(*args)` under the profilers and keep the resulting record."""
+        if not self._busy.acquire(blocking=False):
+            logger.debug("Profiler busy; running folio=%s unprofiled", folio_id, extra={"folio": folio_id})
+            return fn(*args)
+        try:
+            return self._profile(folio_id, fn, *args)
+        finally:
+            self._busy.release()
+
+    def _profile(self, folio_id: str, fn: Callable[..., T], *args: Any) -> T:
+        trace_memory = self.trace_memory and not tracemalloc.is_tracing()
+        if trace_memory:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started_at = time.time()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            record = ProfileRecord(
+                folio_id=folio_id,
+                started_at=started_at,
+                duration_ms=duration_ms,
+                functions={
+                    key: (calls, tottime, cumtime)
+                    for key, (_, calls, tottime, cumtime, _) in pstats.Stats(profile).stats.items()  # type: ignore[attr-defined]
+                },
+            )
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                record.peak_memory_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                tracemalloc.stop()
+                record.top_allocations = [
+                    {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:10]
+                ]
+            self._records.append(record)
+            logger.info("Profiled folio=%s in %.1fms", folio_id, duration_ms, extra={"folio": folio_id})
+
+    def records(self) -> list[ProfileRecord]:
+        return list(self._records)
+
+    def hot_functions(self, *, limit: int = 20, sort: str = "cumtime", component: str | None = None) -> list[dict[str, Any]]:
+        """Aggregate function stats across buffered profiles, hottest first."""
+        totals: dict[FunctionKey, list[float]] = {}
+        for record in list(self._records):
+            for key, (calls, tottime, cumtime) in record.functions.items():
+                if component is not None and component_for(key[0]) != component:
+                    continue
+                entry = totals.setdefault(key, [0, 0.0, 0.0])
+                entry[0] += calls
+                entry[1] += tottime
+                entry[2] += cumtime
+
+        rows = [
+            {
+                "function": f"{filename}:{lineno}({name})",
+                "component": component_for(filename),
+                "calls": int(calls),
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+            for (filename, lineno, name), (calls, tottime, cumtime) in totals.items()
+        ]
+        sort_key = "tottime_ms" if sort == "tottime" else "cumtime_ms"
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit]
+
+    def report(self, *, limit: int = 20, sort: str = "cumtime") -> dict[str, Any]:
+        return {
+            "profiles": len(self._records),
+            "recent": [record.summary() for record in list(self._records)[-limit:]],
+            "hot_functions": self.hot_functions(limit=limit, sort=sort),
+            "components": {
+                name: self.hot_functions(limit=limit, sort=sort, component=name)
+                for name in COMPONENTS.values()
+            },
+        }
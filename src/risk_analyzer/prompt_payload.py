@@ -0,0 +1,82 @@
+"""Compact LLM prompt payloads built from folio, signals and baseline."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Iterable, Sequence
+
+from .config import Settings
+from .documents import summarize
+from .schemas import RiskAssessment, TramiteDocument, TramiteFolio
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FOLIO_FIELDS: tuple[str, ...] = (
+    "id",
+    "ramo",
+    "tipo_tramite",
+    "monto_prima",
+    "requiere_reaseguro",
+    "es_urgente",
+    "catalog_line",
+    "estatus",
+)
+
+
+def compact_json(value: Any) -> str:
+    """Serialize without whitespace or ASCII escaping (both cost tokens)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def summarize_documents(documents: Iterable[TramiteDocument], *, top_missing: int) -> dict[str, Any]:
+    """Reduce the documents grid to counts plus the first `top_missing` missing names."""
+    return summarize(documents, max_missing_names=top_missing).model_dump()
+
+
+class LLMPayloadBuilder:
+    """Build the `folio`/`signals`/`baseline` prompt variables as compact JSON strings."""
+
+    def __init__(self, *, fields: Sequence[str] = DEFAULT_FOLIO_FIELDS, top_missing: int = 10):
+        unknown = [name for name in fields if name not in TramiteFolio.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown LLM payload fields {unknown}; expected TramiteFolio fields")
+        self.fields = tuple(fields)
+        self.top_missing = top_missing
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LLMPayloadBuilder":
+        fields = (
+            tuple(name.strip() for name in settings.llm_payload_fields.split(",") if name.strip())
+            if settings.llm_payload_fields
+            else DEFAULT_FOLIO_FIELDS
+        )
+        return cls(fields=fields, top_missing=settings.llm_payload_top_missing)
+
+    def build(self, folio: TramiteFolio, signals: dict, baseline: RiskAssessment) -> dict[str, str]:
+        folio_view = {name: getattr(folio, name) for name in self.fields if getattr(folio, name, None) is not None}
+        if folio.document_summary is not None:
+            # Counted over the whole grid at hydration, even rows beyond the kept documents
+            documents_view = folio.document_summary.model_dump()
+            documents_view["missing_names"] = documents_view["missing_names"][: self.top_missing]
+        else:
+            documents_view = summarize_documents(folio.documents, top_missing=self.top_missing)
+        folio_view["documents"] = documents_view
+
+        signals_view = dict(signals)
+        missing_docs = signals_view.pop("missing_docs", None)
+        if missing_docs is not None:
+            # The folio view already lists the top missing names
+            signals_view.setdefault("missing_docs_count", len(missing_docs))
+
+        baseline_view = {
+            "score": round(baseline.score, 4),
+            "level": baseline.level,
+            "recommendations": baseline.recommendations,
+        }
+        return {
+            "folio": compact_json(folio_view),
+            "signals": compact_json(signals_view),
+            "baseline": compact_json(baseline_view),
+        }
@@ -0,0 +1,102 @@
+"""Client-side request/token budgeting for LLM calls."""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import Callable
+
+from .config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Rough OpenAI-style ratio; good enough to stay under a per-minute quota
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of `text` from its length."""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute / 60` units per second.
+
+    `reserve` debits immediately (the balance may go negative) and returns how
+    long the caller must wait, so concurrent callers queue up in arrival order
+    instead of polling.
+    """
+
+    def __init__(self, per_minute: float, *, clock: Callable[[], float] = time.monotonic):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # A single oversized request can never fit; let it through once the bucket is full
+        self._tokens -= min(amount, self.capacity)
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class LLMRateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter for one provider quota."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        completion_tokens: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self.completion_tokens = completion_tokens
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self, prompt_tokens: int) -> float:
+        """Block until one request of `prompt_tokens` (+ completion reserve) fits the budget.
+
+        Returns the seconds spent waiting.
+        """
+        with self._lock:
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(prompt_tokens + self.completion_tokens))
+        if wait > 0:
+            logger.debug("LLM rate limiter waiting %.2fs for prompt_tokens=%d", wait, prompt_tokens)
+            self._sleep(wait)
+        return wait
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> LLMRateLimiter | None:
+    """Return the process-wide limiter from settings, or None when no quota is configured."""
+
+    settings = get_settings()
+    if not settings.llm_requests_per_minute and not settings.llm_tokens_per_minute:
+        return None
+    logger.info(
+        f"LLM rate limiter enabled: rpm={settings.llm_requests_per_minute} "
+        f"tpm={settings.llm_tokens_per_minute} completion_reserve={settings.llm_completion_tokens}"
+    )
+    return LLMRateLimiter(
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute,
+        completion_tokens=settings.llm_completion_tokens,
+    )
@@ -0,0 +1,185 @@
+"""Record and replay raw Joget payloads for offline runs."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import mmap
+import threading
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import IO, Any
+
+from .documents import DEFAULT_MAX_DOCUMENTS, DEFAULT_MAX_MISSING_NAMES
+from .joget_adapter import JogetClient, JogetError
+from .schemas import TramiteFolio
+
+
+logger = logging.getLogger(__name__)
+
+# Records are written with the primary key first so the index can be built
+# without decoding the (potentially large) payload of every line.
+_KEY_PREFIX = '{"primary_key":'
+_DECODER = json.JSONDecoder()
+
+
+def _is_gzip(path: Path) -> bool:
+    return path.suffix == ".gz"
+
+
+def encode_record(app_id: str, form_id: str, primary_key: str, payload: dict[str, Any]) -> str:
+    """Serialize one archive line (without the trailing newline)."""
+    return json.dumps(
+        {"primary_key": primary_key, "app_id": app_id, "form_id": form_id, "payload": payload},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+class PayloadRecorder:
+    """Append raw `get_form_data` payloads to a JSONL archive (gzip if `.gz`)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._handle: IO[str] = (
+            gzip.open(self.path, "at", encoding="utf-8")
+            if _is_gzip(self.path)
+            else open(self.path, "a", encoding="utf-8")
+        )
+        self.count = 0
+
+    def record(self, app_id: str, form_id: str, primary_key: str, payload: dict[str, Any]) -> None:
+        line = encode_record(app_id, form_id, primary_key, payload)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self.count += 1
+        logger.debug("Recorded Joget payload primary_key=%s", primary_key, extra={"folio": primary_key})
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+        logger.info(f"Recorded {self.count} Joget payloads to {self.path}")
+
+    def __enter__(self) -> "PayloadRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+        self.close()
+
+
+class PayloadArchive(Mapping[str, dict[str, Any]]):
+    """Read-only mapping of primary key -> payload backed by a recorded archive.
+
+    Only byte offsets are kept in memory; each payload is decoded on access.
+    Plain `.jsonl` archives are memory-mapped, `.jsonl.gz` archives are read
+    through a seekable gzip stream (sequential access is the fast path there).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, int]] = {}
+        if _is_gzip(self.path):
+            self._file: IO[bytes] = gzip.open(self.path, "rb")
+            self._mmap: mmap.mmap | None = None
+            self._build_index(self._file)
+        else:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.path.stat().st_size else None
+            if self._mmap is not None:
+                self._build_index(self._mmap)
+        logger.info(f"Indexed {len(self._index)} payloads from {self.path}")
+
+    def _build_index(self, stream: Any) -> None:
+        offset = 0
+        stream.seek(0)
+        for line in iter(stream.readline, b""):
+            length = len(line)
+            if line.strip():
+                # Later recordings of the same key win, like re-fetching from Joget
+                self._index[self._primary_key(line)] = (offset, length)
+            offset += length
+
+    @staticmethod
+    def _primary_key(line: bytes) -> str:
+        text = line.decode("utf-8")
+        if text.startswith(_KEY_PREFIX):
+            key, _ = _DECODER.raw_decode(text, len(_KEY_PREFIX))
+            return str(key)
+        return str(json.loads(text)["primary_key"])
+
+    def raw(self, primary_key: str) -> bytes:
+        """Return the undecoded archive line for `primary_key` (no trailing newline)."""
+        offset, length = self._index[primary_key]
+        if self._mmap is not None:
+            line = self._mmap[offset:offset + length]
+        else:
+            with self._lock:
+                self._file.seek(offset)
+                line = self._file.read(length)
+        return line.rstrip(b"\r\n")
+
+    def __getitem__(self, primary_key: str) -> dict[str, Any]:
+        return json.loads(self.raw(primary_key))["payload"]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "PayloadArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+        self.close()
+
+
+class ReplayJogetClient(JogetClient):
+    """Drop-in `JogetClient` that serves payloads from an archive instead of HTTP.
+
+    `source` is either a path to an archive written by `PayloadRecorder` or
+    any mapping of primary key -> raw payload. Pass the same document caps as
+    the live client (`JOGET_MAX_DOCUMENTS`, `JOGET_MAX_MISSING_NAMES`) so a
+    replayed folio hydrates exactly like the live one.
+    """
+
+    def __init__(
+        self,
+        source: str | Path | Mapping[str, dict[str, Any]],
+        *,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        max_missing_names: int = DEFAULT_MAX_MISSING_NAMES,
+    ):
+        self._max_documents = max_documents
+        self._max_missing_names = max_missing_names
+        if isinstance(source, (str, Path)):
+            self._payloads: Mapping[str, dict[str, Any]] = PayloadArchive(source)
+            self._owns_payloads = True
+        else:
+            self._payloads = source
+            self._owns_payloads = False
+
+    def get_form_data(self, app_id: str, form_id: str, primary_key: str) -> dict[str, Any]:
+        try:
+            return self._payloads[primary_key]
+        except KeyError as exc:
+            raise JogetError(f"No recorded payload for primary_key={primary_key}") from exc
+
+    def fetch_tramite(self, id: str) -> TramiteFolio:
+        return self.hydrate_tramite(
+            self.get_form_data("", "", id),
+            max_documents=self._max_documents,
+            max_missing_names=self._max_missing_names,
+        )
+
+    def close(self) -> None:
+        if self._owns_payloads and isinstance(self._payloads, PayloadArchive):
+            self._payloads.close()
@@ -0,0 +1,182 @@
+"""Templated, memoized rendering of analyst reports."""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import html
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Literal, Sequence
+
+from .schemas import RiskAssessment
+
+
+logger = logging.getLogger(__name__)
+
+ReportFormat = Literal["markdown", "text", "html"]
+_RENDERED_RISK_FIELDS = ("score", "level", "rationale", "recommendations", "baseline_score", "llm_delta")
+
+
+@dataclass(frozen=True)
+class ReportTemplate:
+    """Format strings for each report section; `version` changes with any of them."""
+
+    header: str
+    level: str
+    breakdown: str
+    breakdown_llm: str
+    rationale: str
+    missing_docs: str
+    recommendations_open: str
+    recommendation_item: str
+    recommendations_close: str = ""
+    separator: str = "\n"
+    escape_html: bool = False
+
+    @cached_property
+    def version(self) -> str:
+        fields = json.dumps(dataclasses.astuple(self), ensure_ascii=False)
+        return hashlib.sha1(fields.encode("utf-8")).hexdigest()[:12]
+
+
+DEFAULT_TEMPLATES: dict[str, ReportTemplate] = {
+    "markdown": ReportTemplate(
+        header="Folio **{folio_id}**",
+        level="Nivel de riesgo: **{level}** ({score:.2f}) [{breakdown}]",
+        breakdown="Heurístico: {baseline:.2f}",
+        breakdown_llm="Heurístico: {baseline:.2f} + LLM: {delta:+.2f}",
+        rationale="Motivo: {rationale}",
+        missing_docs="Documentos faltantes: {missing_docs}",
+        recommendations_open="Recomendaciones:",
+        recommendation_item="- {item}",
+    ),
+    "text": ReportTemplate(
+        header="Folio {folio_id}",
+        level="Nivel de riesgo: {level} ({score:.2f}) [{breakdown}]",
+        breakdown="Heurístico: {baseline:.2f}",
+        breakdown_llm="Heurístico: {baseline:.2f} + LLM: {delta:+.2f}",
+        rationale="Motivo: {rationale}",
+        missing_docs="Documentos faltantes: {missing_docs}",
+        recommendations_open="Recomendaciones:",
+        recommendation_item="  * {item}",
+    ),
+    "html": ReportTemplate(
+        header="<h2>Folio {folio_id}</h2>",
+        level="<p>Nivel de riesgo: <strong>{level}</strong> ({score:.2f}) [{breakdown}]</p>",
+        breakdown="Heurístico: {baseline:.2f}",
+        breakdown_llm="Heurístico: {baseline:.2f} + LLM: {delta:+.2f}",
+        rationale="<p>Motivo: {rationale}</p>",
+        missing_docs="<p>Documentos faltantes: {missing_docs}</p>",
+        recommendations_open="<p>Recomendaciones:</p>\n<ul>",
+        recommendation_item="<li>{item}</li>",
+        recommendations_close="</ul>",
+        escape_html=True,
+    ),
+}
+
+
+class ReportRenderer:
+    """Render reports from templates, memoizing the folio-independent body.
+
+    The body (everything below the folio header) only depends on the risk
+    outcome and the missing documents, so identical outcomes share one cache
+    entry. Keys include the template version, so editing a template never
+    serves stale output.
+    """
+
+    def __init__(self, templates: dict[str, ReportTemplate] | None = None, *, cache_size: int = 1024):
+        self._templates = dict(templates or DEFAULT_TEMPLATES)
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def formats(self) -> tuple[str, ...]:
+        return tuple(self._templates)
+
+    def register(self, fmt: str, template: ReportTemplate) -> None:
+        """Add or replace the template for `fmt` and drop every cached body."""
+        with self._lock:
+            self._templates[fmt] = template
+            self._cache.clear()
+        logger.info(f"Registered report template format={fmt} version={template.version}")
+
+    def render(
+        self,
+        folio_id: str,
+        risk: dict,
+        missing_docs: Sequence[str] = (),
+        fmt: str = "markdown",
+        *,
+        missing_count: int | None = None,
+    ) -> str:
+        """Render a report; `missing_count` is the full count when `missing_docs` is only the first names."""
+        try:
+            template = self._templates[fmt]
+        except KeyError:
+            raise ValueError(f"Unknown report format {fmt!r}; expected one of {self.formats}") from None
+
+        omitted = max(0, (missing_count or 0) - len(missing_docs))
+        key = self._cache_key(template, risk, missing_docs, omitted)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if body is None:
+            body = self._render_body(template, risk, missing_docs, omitted)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = body
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        escape = html.escape if template.escape_html else str
+        return template.header.format(folio_id=escape(folio_id)) + template.separator + body
+
+    @staticmethod
+    def _cache_key(template: ReportTemplate, risk: dict, missing_docs: Sequence[str], omitted: int) -> str:
+        # Only the fields the body renders; extras like prompt_tokens must not split the cache
+        rendered = {name: risk.get(name) for name in _RENDERED_RISK_FIELDS}
+        material = json.dumps(
+            [template.version, rendered, list(missing_docs), omitted],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _render_body(template: ReportTemplate, risk: dict, missing_docs: Sequence[str], omitted: int) -> str:
+        escape = html.escape if template.escape_html else str
+        assessment = RiskAssessment.model_validate(risk)
+        baseline = risk.get("baseline_score", assessment.score)
+        delta = risk.get("llm_delta", 0.0)
+
+        breakdown = (
+            template.breakdown_llm.format(baseline=baseline, delta=delta)
+            if delta != 0.0
+            else template.breakdown.format(baseline=baseline)
+        )
+        lines = [
+            template.level.format(level=assessment.level.upper(), score=assessment.score, breakdown=breakdown),
+            template.rationale.format(rationale=escape(assessment.rationale)),
+        ]
+        if missing_docs:
+            listed = ", ".join(missing_docs)
+            if omitted:
+                listed += f" (+{omitted} más)"
+            lines.append(template.missing_docs.format(missing_docs=escape(listed)))
+        if assessment.recommendations:
+            lines.append(template.recommendations_open)
+            lines.extend(template.recommendation_item.format(item=escape(item)) for item in assessment.recommendations)
+            if template.recommendations_close:
+                lines.append(template.recommendations_close)
+        return template.separator.join(lines)
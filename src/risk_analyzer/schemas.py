@@ -11,6 +11,16 @@ class TramiteDocument(BaseModel):
     uploaded: bool
 
 
+class DocumentSummary(BaseModel):
+    """Counts over the whole documents grid, plus the first missing document names."""
+
+    total: int = 0
+    required: int = 0
+    uploaded: int = 0
+    missing: int = 0
+    missing_names: List[str] = Field(default_factory=list)
+
+
 class TramiteFolio(BaseModel):
     id: str
     ramo: str
@@ -22,6 +32,7 @@ class TramiteFolio(BaseModel):
     estatus: str | None = None
     updated_at: datetime | None = None
     documents: List[TramiteDocument] = Field(default_factory=list)
+    document_summary: DocumentSummary | None = None
 
 
 class AnalyzerState(BaseModel):
@@ -29,9 +40,36 @@ class AnalyzerState(BaseModel):
     folio: Optional[TramiteFolio] = None
     signals: dict = Field(default_factory=dict)
     risk: dict = Field(default_factory=dict)
+    report_format: str = "markdown"
     report: Optional[str] = None
 
 
+class JogetEvent(BaseModel):
+    id: str
+    tenant: str | None = None
+    event: str = "save"
+    estatus: str | None = None
+
+
+class HeuristicRules(BaseModel):
+    """Tunable parameters of `scoring.heuristic_score`; defaults are the production rules."""
+
+    critical_ramos: List[str] = Field(default_factory=lambda: ["daños", "vida"])
+    premium_threshold: float = 1_000_000
+    critical_premium_increment: float = 0.6
+    reinsurance_increment: float = 0.25
+    missing_doc_increment: float = 0.05
+    missing_docs_cap: float = 0.15
+    urgency_increment: float = 0.1
+    high_threshold: float = 0.7
+    medium_threshold: float = 0.4
+
+
+class SimulationRequest(BaseModel):
+    rules: HeuristicRules = Field(default_factory=HeuristicRules)
+    affected_limit: int = Field(default=1000, ge=0)
+
+
 class RiskAssessment(BaseModel):
     score: float
     level: str
@@ -3,63 +3,84 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable
 
-from .schemas import RiskAssessment, TramiteFolio
+from .documents import document_summary
+from .schemas import HeuristicRules, RiskAssessment, TramiteFolio
 
 
 logger = logging.getLogger(__name__)
+DEFAULT_RULES = HeuristicRules()
 
 
-def heuristic_score(folio: TramiteFolio, *, signals: dict | None = None) -> RiskAssessment:
-    """Produce a baseline risk score before LLM adjustment."""
+def risk_level(score: float, rules: HeuristicRules = DEFAULT_RULES) -> str:
+    return "alto" if score >= rules.high_threshold else "medio" if score >= rules.medium_threshold else "bajo"
 
-    signal_keys = sorted(signals.keys()) if isinstance(signals, dict) else []
-    logger.debug(
-        "Starting heuristic scoring folio=%s ramo=%s prima=%.2f signals=%s",
-        folio.id,
-        folio.ramo,
-        folio.monto_prima,
-        signal_keys,
-    )
 
-    score = 0.0
-    recommendations: list[str] = []
+def heuristic_score(
+    folio: TramiteFolio,
+    *,
+    signals: dict | None = None,
+    rules: HeuristicRules = DEFAULT_RULES,
+) -> RiskAssessment:
+    """Produce a baseline risk score before LLM adjustment."""
 
-    if folio.ramo.lower() in {"daños", "vida"} and folio.monto_prima >= 1_000_000:
-        score += 0.6
-        recommendations.append("Validar exposición por monto alto en ramo crítico")
+    extra = {"folio": folio.id}
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
         logger.debug(
-            "Applied critical ramo premium rule folio=%s ramo=%s prima=%.2f increment=0.60",
+            "Starting heuristic scoring folio=%s ramo=%s prima=%.2f signals=%s",
             folio.id,
             folio.ramo,
             folio.monto_prima,
+            sorted(signals.keys()) if isinstance(signals, dict) else [],
+            extra=extra,
         )
 
+    score = 0.0
+    recommendations: list[str] = []
+
+    critical_ramos = {ramo.lower() for ramo in rules.critical_ramos}
+    if folio.ramo.lower() in critical_ramos and folio.monto_prima >= rules.premium_threshold:
+        score += rules.critical_premium_increment
+        recommendations.append("Validar exposición por monto alto en ramo crítico")
+        if debug:
+            logger.debug(
+                "Applied critical ramo premium rule folio=%s ramo=%s prima=%.2f increment=%.2f",
+                folio.id,
+                folio.ramo,
+                folio.monto_prima,
+                rules.critical_premium_increment,
+                extra=extra,
+            )
+
     if folio.requiere_reaseguro:
-        score += 0.25
+        score += rules.reinsurance_increment
         recommendations.append("Confirmar capacidad de reasegurador")
-        logger.debug("Applied reinsurance rule folio=%s increment=0.25", folio.id)
+        if debug:
+            logger.debug("Applied reinsurance rule folio=%s increment=%.2f", folio.id, rules.reinsurance_increment, extra=extra)
 
-    missing_docs = _count_missing_docs(folio.documents)
+    missing_docs = document_summary(folio).missing
     if missing_docs:
-        increment = min(0.15, missing_docs * 0.05)
+        increment = min(rules.missing_docs_cap, missing_docs * rules.missing_doc_increment)
         score += increment
         recommendations.append(f"Solicitar {missing_docs} documentos faltantes")
-        logger.debug(
-            "Applied missing docs rule folio=%s missing=%d increment=%.2f",
-            folio.id,
-            missing_docs,
-            increment,
-        )
+        if debug:
+            logger.debug(
+                "Applied missing docs rule folio=%s missing=%d increment=%.2f",
+                folio.id,
+                missing_docs,
+                increment,
+                extra=extra,
+            )
 
     if folio.es_urgente is True:
-        score += 0.1
+        score += rules.urgency_increment
         recommendations.append("Priorizar folio urgente en cola")
-        logger.debug("Applied urgency rule folio=%s increment=0.10", folio.id)
+        if debug:
+            logger.debug("Applied urgency rule folio=%s increment=%.2f", folio.id, rules.urgency_increment, extra=extra)
 
     score = max(0.0, min(1.0, score))
-    level = "alto" if score >= 0.7 else "medio" if score >= 0.4 else "bajo"
+    level = risk_level(score, rules)
     rationale = (
         f"Riesgo {level} generado por ramo {folio.ramo}, prima {folio.monto_prima}, "
         f"reaseguro {'sí' if folio.requiere_reaseguro else 'no'} y {missing_docs} docs faltantes"
@@ -72,10 +93,7 @@ def heuristic_score(folio: TramiteFolio, *, signals: dict | None = None) -> Risk
         level,
         missing_docs,
         len(recommendations),
+        extra=extra,
     )
 
     return RiskAssessment(score=score, level=level, rationale=rationale, recommendations=recommendations)
-
-
-def _count_missing_docs(documents: Iterable) -> int:
-    return sum(1 for doc in documents if getattr(doc, "required", False) and not getattr(doc, "uploaded", False))
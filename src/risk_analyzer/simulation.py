@@ -0,0 +1,232 @@
+"""What-if simulation of heuristic rule changes over a stored feature snapshot."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+from .documents import document_summary
+from .joget_adapter import JogetClient
+from .logging_setup import configure_logging
+from .replay import PayloadArchive
+from .schemas import HeuristicRules, TramiteFolio
+from .scoring import DEFAULT_RULES
+
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("bajo", "medio", "alto")
+SNAPSHOT_VERSION = 2
+
+# Column name -> array typecode; order is the on-disk order
+_COLUMNS = {
+    "ramo": "I",
+    "prima": "d",
+    "reaseguro": "b",
+    "urgente": "b",
+    "missing": "I",
+}
+
+
+class FeatureSnapshot:
+    """Columnar store of exactly the folio features `heuristic_score` reads.
+
+    Ramos are dictionary-encoded, so changing the critical ramo list only
+    touches the (small) vocabulary, not every row.
+    """
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.ramos: list[str] = []
+        self._ramo_codes: dict[str, int] = {}
+        self.columns: dict[str, array] = {name: array(code) for name, code in _COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, folio: TramiteFolio) -> None:
+        ramo = folio.ramo.lower()
+        code = self._ramo_codes.get(ramo)
+        if code is None:
+            code = self._ramo_codes[ramo] = len(self.ramos)
+            self.ramos.append(ramo)
+        self.ids.append(folio.id)
+        self.columns["ramo"].append(code)
+        self.columns["prima"].append(folio.monto_prima)
+        self.columns["reaseguro"].append(bool(folio.requiere_reaseguro))
+        self.columns["urgente"].append(folio.es_urgente is True)
+        self.columns["missing"].append(document_summary(folio).missing)
+
+    @classmethod
+    def from_folios(cls, folios: Iterable[TramiteFolio]) -> "FeatureSnapshot":
+        snapshot = cls()
+        for folio in folios:
+            snapshot.append(folio)
+        return snapshot
+
+    def save(self, path: str | Path) -> None:
+        # A JSON array keeps ids containing newlines (or any separator) aligned with the rows
+        ids_blob = json.dumps(self.ids, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(self.ids),
+            "ramos": self.ramos,
+            "ids_bytes": len(ids_blob),
+        }
+        with open(path, "wb") as handle:
+            handle.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            handle.write(ids_blob)
+            for name in _COLUMNS:
+                self.columns[name].tofile(handle)
+        logger.info("Saved feature snapshot rows=%d to %s", len(self.ids), path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "FeatureSnapshot":
+        snapshot = cls()
+        with open(path, "rb") as handle:
+            header = json.loads(handle.readline())
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {header.get('version')!r}")
+            rows = header["rows"]
+            snapshot.ids = json.loads(handle.read(header["ids_bytes"]))
+            if len(snapshot.ids) != rows:
+                raise ValueError(f"Snapshot lists {len(snapshot.ids)} ids for {rows} rows")
+            snapshot.ramos = list(header["ramos"])
+            snapshot._ramo_codes = {ramo: code for code, ramo in enumerate(snapshot.ramos)}
+            for name, column in snapshot.columns.items():
+                column.fromfile(handle, rows)
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+        logger.info("Loaded feature snapshot rows=%d from %s", rows, path)
+        return snapshot
+
+
+def _levels(snapshot: FeatureSnapshot, rules: HeuristicRules) -> bytearray:
+    """Return one level index (0=bajo, 1=medio, 2=alto) per row."""
+    critical_names = {ramo.lower() for ramo in rules.critical_ramos}
+    critical = [ramo in critical_names for ramo in snapshot.ramos]
+    threshold = rules.premium_threshold
+    premium_inc = rules.critical_premium_increment
+    reinsurance_inc = rules.reinsurance_increment
+    doc_inc = rules.missing_doc_increment
+    doc_cap = rules.missing_docs_cap
+    urgency_inc = rules.urgency_increment
+    high = rules.high_threshold
+    medium = rules.medium_threshold
+
+    cols = snapshot.columns
+    out = bytearray(len(snapshot))
+    for i, (ramo, prima, reaseguro, urgente, missing) in enumerate(
+        zip(cols["ramo"], cols["prima"], cols["reaseguro"], cols["urgente"], cols["missing"])
+    ):
+        # Same accumulation order as heuristic_score so float rounding matches
+        score = 0.0
+        if critical[ramo] and prima >= threshold:
+            score += premium_inc
+        if reaseguro:
+            score += reinsurance_inc
+        if missing:
+            score += min(doc_cap, missing * doc_inc)
+        if urgente:
+            score += urgency_inc
+        score = max(0.0, min(1.0, score))
+        out[i] = 2 if score >= high else 1 if score >= medium else 0
+    return out
+
+
+def simulate(
+    snapshot: FeatureSnapshot,
+    rules: HeuristicRules,
+    *,
+    baseline: HeuristicRules = DEFAULT_RULES,
+    affected_limit: int = 1000,
+) -> dict[str, Any]:
+    """Compare risk levels under `baseline` and `rules` for every snapshot row."""
+    start = time.perf_counter()
+    before = _levels(snapshot, baseline)
+    after = _levels(snapshot, rules)
+
+    matrix = [[0] * len(LEVELS) for _ in LEVELS]
+    affected: list[dict[str, str]] = []
+    changed = 0
+    for i, (old, new) in enumerate(zip(before, after)):
+        matrix[old][new] += 1
+        if old != new:
+            changed += 1
+            if len(affected) < affected_limit:
+                affected.append({"id": snapshot.ids[i], "from": LEVELS[old], "to": LEVELS[new]})
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info("Simulated %d folios in %.1fms changed=%d", len(snapshot), elapsed_ms, changed)
+    return {
+        "folios": len(snapshot),
+        "changed": changed,
+        "transitions": {
+            LEVELS[old]: {LEVELS[new]: matrix[old][new] for new in range(len(LEVELS))}
+            for old in range(len(LEVELS))
+        },
+        "affected": affected,
+        "affected_truncated": changed > len(affected),
+        "rules": rules.model_dump(),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="What-if simulation over heuristic risk rules")
+    parser.add_argument("--debug", action="store_true", help="Enable DEBUG logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snap = commands.add_parser("snapshot", help="Build a feature snapshot from a recorded payload archive")
+    snap.add_argument("--input", type=Path, required=True, help="Payload archive written by PayloadRecorder")
+    snap.add_argument("--output", type=Path, required=True, help="Snapshot file to write")
+
+    sim = commands.add_parser("simulate", help="Evaluate alternative rules over a snapshot")
+    sim.add_argument("--snapshot", type=Path, required=True, help="Snapshot file")
+    sim.add_argument("--rules", default="{}", help='JSON rule overrides, e.g. \'{"premium_threshold": 500000}\'')
+    sim.add_argument("--limit", type=int, default=1000, help="Maximum affected folio IDs to list")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings = get_settings()
+    log_listener = configure_logging(
+        level=logging.DEBUG if args.debug else settings.log_level.upper(),
+        fmt=settings.log_format,
+        debug_sample_rate=settings.log_debug_sample_rate,
+    )
+    try:
+        if args.command == "snapshot":
+            snapshot = FeatureSnapshot()
+            skipped = 0
+            with PayloadArchive(args.input) as archive:
+                for key in archive:
+                    try:
+                        snapshot.append(JogetClient.hydrate_tramite(archive[key]))
+                    except ValueError as e:
+                        skipped += 1
+                        logger.warning("Skipping %s: %s", key, e)
+            snapshot.save(args.output)
+            logger.info("Snapshot complete: %d folios, %d skipped", len(snapshot), skipped)
+            return
+
+        rules = HeuristicRules.model_validate(json.loads(args.rules))
+        result = simulate(FeatureSnapshot.load(args.snapshot), rules, affected_limit=args.limit)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Registry of Joget tenants (apps / insurance lines) served by one deployment."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import BaseModel, Field
+
+from .config import Settings
+from .documents import DEFAULT_MAX_DOCUMENTS, DEFAULT_MAX_MISSING_NAMES
+from .joget_adapter import DEFAULT_MAX_PAYLOAD_BYTES, JogetClient
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+# Tenant names prefix cache keys as "<tenant>:<key>", so they must not contain ":"
+TENANT_NAME_PATTERN = r"^[A-Za-z0-9_-]+$"
+
+GraphFactory = Callable[[JogetClient], Any]
+
+
+def cache_key(tenant: str, key: str) -> str:
+    """Namespace a cache key (e.g. a folio id) so tenants never share entries."""
+    return f"{tenant}:{key}"
+
+
+def split_cache_key(namespaced: str) -> tuple[str, str]:
+    tenant, _, key = namespaced.partition(":")
+    return tenant, key
+
+
+class TenantConfig(BaseModel):
+    """Connection, credentials and form mapping of one Joget app."""
+
+    name: str = Field(pattern=TENANT_NAME_PATTERN)
+    base_url: str
+    username: str
+    password: str
+    app_id: str
+    tramite_form_id: str
+    max_connections: int = 20
+    max_payload_bytes: int = DEFAULT_MAX_PAYLOAD_BYTES
+    max_documents: int = DEFAULT_MAX_DOCUMENTS
+    max_missing_names: int = DEFAULT_MAX_MISSING_NAMES
+
+
+class Tenant:
+    """A tenant's pooled Joget client plus its lazily compiled graph."""
+
+    def __init__(self, config: TenantConfig, graph_factory: GraphFactory):
+        self.config = config
+        self.client = JogetClient(
+            base_url=config.base_url,
+            username=config.username,
+            password=config.password,
+            app_id=config.app_id,
+            tramite_form_id=config.tramite_form_id,
+            max_connections=config.max_connections,
+            max_payload_bytes=config.max_payload_bytes,
+            max_documents=config.max_documents,
+            max_missing_names=config.max_missing_names,
+        )
+        self._graph_factory = graph_factory
+        self._graph = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def graph(self) -> Any:
+        if self._graph is None:
+            with self._lock:
+                if self._graph is None:
+                    self._graph = self._graph_factory(self.client)
+                    logger.info("Compiled graph for tenant=%s app_id=%s", self.name, self.config.app_id)
+        return self._graph
+
+
+class TenantRegistry:
+    """Tenant name -> `Tenant`, built from settings.
+
+    The `default` tenant comes from the single-app `JOGET_*` variables; more are
+    declared as a JSON object in `JOGET_TENANTS` or in the `JOGET_TENANTS_FILE`
+    it points to, e.g. `{"vida": {"base_url": ..., "app_id": ..., ...}}`.
+    """
+
+    def __init__(self, configs: list[TenantConfig], graph_factory: GraphFactory):
+        self._tenants = {config.name: Tenant(config, graph_factory) for config in configs}
+        if DEFAULT_TENANT not in self._tenants:
+            raise ValueError(f"Tenant registry requires a {DEFAULT_TENANT!r} tenant")
+        logger.info("Tenant registry initialized with tenants=%s", sorted(self._tenants))
+
+    @classmethod
+    def from_settings(cls, settings: Settings, graph_factory: GraphFactory) -> "TenantRegistry":
+        limits = {
+            "max_payload_bytes": settings.joget_max_payload_bytes,
+            "max_documents": settings.joget_max_documents,
+            "max_missing_names": settings.joget_max_missing_names,
+        }
+        configs = [
+            TenantConfig(
+                name=DEFAULT_TENANT,
+                base_url=settings.joget_base_url,
+                username=settings.joget_username,
+                password=settings.joget_password,
+                app_id=settings.joget_app_id,
+                tramite_form_id=settings.joget_tramite_form_id,
+                **limits,
+            )
+        ]
+        raw = settings.joget_tenants
+        if settings.joget_tenants_file:
+            raw = Path(settings.joget_tenants_file).read_text(encoding="utf-8")
+        if raw:
+            for name, entry in json.loads(raw).items():
+                configs.append(TenantConfig.model_validate({**limits, **entry, "name": name}))
+        return cls(configs, graph_factory)
+
+    def get(self, name: str | None = None) -> Tenant:
+        """Return the tenant, or raise `KeyError` for unknown names."""
+        return self._tenants[name or DEFAULT_TENANT]
+
+    def names(self) -> list[str]:
+        return sorted(self._tenants)
+
+    def close(self) -> None:
+        for tenant in self._tenants.values():
+            tenant.client.close()
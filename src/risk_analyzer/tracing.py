@@ -0,0 +1,299 @@
+"""Request tracing: nested spans, a context-local current span and pluggable exporters."""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, Protocol, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation; children share the root's `trace_id`."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "duration_ms", "attributes", "status", "error", "_start", "_trace")
+
+    def __init__(self, name: str, *, parent: "Span | None" = None, attributes: dict[str, Any] | None = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time.time()
+        self.duration_ms: float | None = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error: str | None = None
+        self._start = time.perf_counter()
+        self._trace: _Trace = parent._trace if parent is not None else _Trace()
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in when tracing is off or the trace was not sampled."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Finished spans of one trace, exported together when the root ends."""
+
+    __slots__ = ("spans", "closed")
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.closed = False
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class InMemoryExporter:
+    """Keep exported spans in a list (tests, ad-hoc inspection)."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.spans.extend(spans)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlFileExporter:
+    """Append one JSON object per span to a local file, one trace per write."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def export(self, spans: Sequence[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(), ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+            for span in spans
+        )
+        with self._lock:
+            self._handle.write(lines)
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+_current: ContextVar[Span | _NoopSpan | None] = ContextVar("risk_analyzer_span", default=None)
+
+
+class Tracer:
+    """Create spans and hand finished traces to `exporter`.
+
+    The sampling decision is taken once per root span; children of an
+    unsampled root are no-ops too. Without an exporter every span is a no-op.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        *,
+        sample_rate: float = 1.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._rng = rng
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        parent = _current.get()
+        if parent is NOOP_SPAN or (parent is None and self._rng() >= self.sample_rate):
+            token = _current.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current.reset(token)
+            return
+
+        span = Span(name, parent=parent, attributes=attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.duration_ms = round((time.perf_counter() - span._start) * 1000, 3)
+            _current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        trace = span._trace
+        if span.parent_id is not None and not trace.closed:
+            trace.spans.append(span)
+            return
+        if span.parent_id is None:
+            trace.closed = True
+            spans = [*trace.spans, span]
+            trace.spans = []
+        else:
+            # A child that outlived its root is exported on its own
+            spans = [span]
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning("Span export failed: %s: %s", type(e).__name__, e)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """Install `tracer` process-wide and return the previous one."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def span(name: str, **attributes: Any):
+    """Open a span on the process-wide tracer: `with tracing.span("fetch", folio_id=id) as s: ...`."""
+    return _tracer.span(name, **attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """Return the active span, or a no-op span outside any trace."""
+    return _current.get() or NOOP_SPAN
+
+
+def build_exporter(name: str, *, jsonl_path: str | Path = "traces.jsonl") -> SpanExporter | None:
+    """Resolve an exporter by name: `none`, `jsonl`, `memory` or a `package.module:factory` path."""
+    normalized = name.strip().lower()
+    if normalized in ("", "none", "off"):
+        return None
+    if normalized == "jsonl":
+        return JsonlFileExporter(jsonl_path)
+    if normalized == "memory":
+        return InMemoryExporter()
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown tracing exporter {name!r}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def configure_tracing(exporter: str = "none", *, jsonl_path: str | Path = "traces.jsonl", sample_rate: float = 1.0) -> Tracer:
+    """Build and install the process-wide tracer."""
+    tracer = Tracer(build_exporter(exporter, jsonl_path=jsonl_path), sample_rate=sample_rate)
+    set_tracer(tracer)
+    if tracer.enabled:
+        logger.info("Tracing enabled: exporter=%s sample_rate=%s", exporter, sample_rate)
+    return tracer
+
+
+def summarize(path: str | Path, *, limit: int = 10) -> list[dict[str, Any]]:
+    """Return the `limit` slowest traces in a JSONL export with their time per span name."""
+    traces: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                traces[record["trace_id"]].append(record)
+
+    rows = []
+    for trace_id, spans in traces.items():
+        root = next((s for s in spans if s["parent_id"] is None), None)
+        if root is None:
+            continue
+        breakdown: dict[str, float] = defaultdict(float)
+        for s in spans:
+            if s is not root:
+                breakdown[s["name"]] += s["duration_ms"] or 0.0
+        rows.append({
+            "trace_id": trace_id,
+            "name": root["name"],
+            "duration_ms": root["duration_ms"],
+            "status": root["status"],
+            "attributes": root["attributes"],
+            "spans": dict(sorted(breakdown.items(), key=lambda item: item[1], reverse=True)),
+        })
+    rows.sort(key=lambda row: row["duration_ms"] or 0.0, reverse=True)
+    return rows[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show the slowest traces in a JSONL span export")
+    parser.add_argument("path", type=Path, help="File written by the jsonl exporter (TRACING_JSONL_PATH)")
+    parser.add_argument("--limit", type=int, default=10, help="Number of traces to show")
+    args = parser.parse_args()
+    print(json.dumps(summarize(args.path, limit=args.limit), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,19 @@ if env_file.exists():
 # Now import config after environment is ready
 from risk_analyzer.config import get_settings
 get_settings.cache_clear()
+
+
+import pytest
+
+
+@pytest.fixture
+def joget_env(monkeypatch):
+    """Provide placeholder Joget settings for tests that never reach the network."""
+    monkeypatch.setenv("JOGET_BASE_URL", "http://joget.test/jw")
+    monkeypatch.setenv("JOGET_USERNAME", "admin")
+    monkeypatch.setenv("JOGET_PASSWORD", "admin")
+    monkeypatch.setenv("JOGET_APP_ID", "insurancePolicyWorkflow")
+    monkeypatch.setenv("JOGET_TRAMITE_FORM_ID", "insurancePolicies")
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+import pytest
+
+from risk_analyzer.admission import AdmissionController, AdmissionRejected
+
+
+logger = logging.getLogger(__name__)
+
+
+def test_queued_work_is_served_by_priority():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=3)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def job(name: str, priority: str):
+            async with controller.admit(priority):
+                order.append(name)
+                await gate.wait()
+
+        first = asyncio.create_task(job("first", "low"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(job(name, prio)) for name, prio in [("low", "low"), ("normal", "normal"), ("urgent", "urgent")]]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 3
+
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    logger.debug(f"Admission order={order}")
+    assert order == ["first", "urgent", "normal", "low"]
+
+
+def test_full_queue_rejects_or_sheds():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, retry_after=5)
+        gate = asyncio.Event()
+
+        async def job(priority: str):
+            async with controller.admit(priority):
+                await gate.wait()
+
+        running = asyncio.create_task(job("normal"))
+        await asyncio.sleep(0)
+        queued_low = asyncio.create_task(job("low"))
+        await asyncio.sleep(0)
+
+        # Same or lower priority than the queued waiter: refused outright
+        with pytest.raises(AdmissionRejected) as rejected:
+            await job("low")
+        assert (rejected.value.status_code, rejected.value.retry_after) == (429, 5)
+
+        # Higher priority: the queued low-priority waiter is shed instead
+        urgent = asyncio.create_task(job("urgent"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as shed:
+            await queued_low
+        assert shed.value.status_code == 503
+
+        gate.set()
+        await asyncio.gather(running, urgent)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats == {"active": 0, "queued": 0, "max_concurrency": 1, "max_queue": 1, "rejected": 1, "shed": 1}
+
+
+def test_priority_from_header_or_remembered_urgency():
+    controller = AdmissionController(max_concurrency=1, max_queue=1)
+
+    assert controller.priority_for("ID-1") == "normal"
+    controller.note_urgency("ID-1", True)
+    assert controller.priority_for("ID-1") == "urgent"
+    assert controller.priority_for("ID-1", "Low") == "low"
+    with pytest.raises(ValueError):
+        controller.priority_for("ID-1", "vip")
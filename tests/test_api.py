@@ -76,3 +76,243 @@ def test_analyze_endpoint_invalid_folio():
     assert response.status_code == 500
     data = response.json()
     assert "detail" in data
+
+
+def test_analyze_rejects_unknown_report_format():
+    """Test analyze endpoint validates the report format before running the graph."""
+    response = client.post("/analyze/ID-1", params={"format": "pdf"})
+    assert response.status_code == 422
+
+
+class _FakeFolio:
+    es_urgente = True
+
+    def model_dump(self):
+        return {"id": "ID-1", "es_urgente": True}
+
+
+class _FakeGraph:
+    def invoke(self, state):
+        return {"id": state.id, "folio": _FakeFolio(), "signals": {}, "risk": {"level": "bajo"}, "report": "ok"}
+
+
+def test_analyze_admission_priority(monkeypatch, joget_env):
+    """Test analyze endpoint runs through admission control and remembers urgency."""
+    from risk_analyzer import api
+    from risk_analyzer.admission import AdmissionController
+
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(api, "_graph_app", _FakeGraph())
+    monkeypatch.setattr(api, "_admission", controller)
+
+    assert client.post("/analyze/ID-1", headers={"X-Priority": "vip"}).status_code == 400
+
+    response = client.post("/analyze/ID-1")
+    assert response.status_code == 200
+    assert response.json()["report"] == "ok"
+    assert controller.priority_for("default:ID-1") == "urgent"
+
+    # Saturate the single slot: with no queue the next request is refused with Retry-After
+    controller._active = 1
+    response = client.post("/analyze/ID-1")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_profiles_endpoint_collects_forced_profiles(monkeypatch, joget_env):
+    """Test the admin profiles endpoint aggregates requests sent with X-Debug-Profile and an admin token."""
+    from risk_analyzer import api
+    from risk_analyzer.admission import AdmissionController
+    from risk_analyzer.config import get_settings
+    from risk_analyzer.profiling import RequestProfiler
+
+    monkeypatch.setattr(api, "_graph_app", _FakeGraph())
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1, max_queue=0))
+    monkeypatch.setattr(api, "_profiler", RequestProfiler(trace_memory=False))
+    monkeypatch.setenv("PROFILE_ADMIN_TOKEN", "s3cret")
+    get_settings.cache_clear()
+    admin = {"X-Admin-Token": "s3cret"}
+    try:
+        assert client.post("/analyze/ID-1").status_code == 200
+        assert client.post("/analyze/ID-1", headers={**admin, "X-Debug-Profile": "0"}).status_code == 200
+        assert client.post("/analyze/ID-1", headers={**admin, "X-Debug-Profile": "false"}).status_code == 200
+        assert client.post("/analyze/ID-1", headers={"X-Debug-Profile": "1"}).status_code == 200
+        assert client.post("/analyze/ID-1", headers={"X-Debug-Profile": "1", "X-Admin-Token": "guess"}).status_code == 200
+        assert client.post("/analyze/ID-1", headers={**admin, "X-Debug-Profile": "1"}).status_code == 200
+
+        assert client.get("/admin/profiles").status_code == 403
+        assert client.get("/admin/profiles", headers={"X-Admin-Token": "guess"}).status_code == 403
+        data = client.get("/admin/profiles", params={"limit": 3}, headers=admin).json()
+        assert data["profiles"] == 1
+        assert data["recent"][0]["folio_id"] == "ID-1"
+        assert any("invoke" in row["function"] for row in data["hot_functions"])
+
+        # Without a configured token the admin surface stays closed
+        monkeypatch.delenv("PROFILE_ADMIN_TOKEN")
+        get_settings.cache_clear()
+        assert client.get("/admin/profiles", headers=admin).status_code == 403
+    finally:
+        get_settings.cache_clear()
+
+
+async def _never_called(key):
+    raise AssertionError("background analysis should not run in this test")
+
+
+class _ScoredGraph:
+    def invoke(self, state):
+        return {
+            "id": state.id,
+            "folio": _FakeFolio(),
+            "signals": {"missing_docs": []},
+            "risk": {"score": 0.2, "level": "bajo", "rationale": "fresh", "recommendations": []},
+            "report": f"fresh {state.report_format}",
+        }
+
+
+def test_refresh_replaces_cached_result(monkeypatch, joget_env):
+    """Test ?refresh=true stores the fresh result so later requests stop serving the stale one."""
+    from risk_analyzer import api
+    from risk_analyzer.admission import AdmissionController
+    from risk_analyzer.prescoring import PrescoreScheduler, ResultCache
+
+    scheduler = PrescoreScheduler(_never_called, ResultCache(ttl_seconds=60), debounce_seconds=3600)
+    scheduler.cache.put("default:ID-1", {"id": "ID-1", "folio": {"id": "ID-1"}, "signals": {}, "risk": {}, "report": "stale"})
+    monkeypatch.setattr(api, "_prescorer", scheduler)
+    monkeypatch.setattr(api, "_graph_app", _ScoredGraph())
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1, max_queue=0))
+
+    refreshed = client.post("/analyze/ID-1", params={"refresh": True})
+    assert refreshed.headers["X-Cache"] == "miss"
+    assert refreshed.json()["report"] == "fresh markdown"
+
+    response = client.post("/analyze/ID-1")
+    assert response.headers["X-Cache"] == "hit"
+    assert response.json()["report"] == "fresh markdown"
+
+    # A refresh in another format still caches a markdown report
+    assert client.post("/analyze/ID-1", params={"refresh": True, "format": "html"}).json()["report"] == "fresh html"
+    assert client.post("/analyze/ID-1").json()["report"].startswith("Folio **ID-1**")
+
+
+def test_prescored_result_is_served_from_cache(monkeypatch, joget_env):
+    """Test /analyze serves webhook pre-scored results and events invalidate them."""
+    from risk_analyzer import api
+    from risk_analyzer.prescoring import PrescoreScheduler, ResultCache
+
+    scheduler = PrescoreScheduler(_never_called, ResultCache(ttl_seconds=60), debounce_seconds=3600)
+    monkeypatch.setattr(api, "_prescorer", scheduler)
+    monkeypatch.setattr(api, "_graph_app", _FakeGraph())
+    scheduler.cache.put("default:ID-9", {
+        "id": "ID-9",
+        "folio": {"id": "WFE-9"},
+        "signals": {"missing_docs": ["Contrato"]},
+        "risk": {"score": 0.5, "level": "medio", "rationale": "r", "recommendations": []},
+        "report": "cached markdown",
+    })
+
+    response = client.post("/analyze/ID-9")
+    assert response.headers["X-Cache"] == "hit"
+    assert response.json()["report"] == "cached markdown"
+
+    html = client.post("/analyze/ID-9", params={"format": "html"}).json()["report"]
+    assert html.startswith("<h2>Folio WFE-9</h2>")
+
+    event = client.post("/events/joget", json={"id": "ID-9", "event": "status_change", "estatus": "En revisión"})
+    assert event.status_code == 202
+    assert event.json() == {"id": "ID-9", "tenant": "default", "status": "scheduled"}
+    assert scheduler.cache.get("default:ID-9") is None
+
+
+def test_unknown_tenant_returns_404(monkeypatch, joget_env):
+    """Test tenant selection by header and path rejects tenants that are not configured."""
+    from risk_analyzer import api
+
+    monkeypatch.setattr(api, "_graph_app", _FakeGraph())
+    monkeypatch.setattr(api, "_registry", None)
+
+    assert client.post("/analyze/ID-1", headers={"X-Joget-Tenant": "vida"}).status_code == 404
+    assert client.post("/tenants/vida/analyze/ID-1").status_code == 404
+    assert client.post("/events/joget", json={"id": "ID-1", "tenant": "vida"}).status_code == 404
+
+
+def test_event_for_configured_tenant_before_lifespan(monkeypatch, joget_env):
+    """Test webhook events resolve tenants from settings even when the lifespan hook has not run."""
+    import json
+
+    from langchain_core.runnables import RunnableLambda
+
+    from risk_analyzer import api
+    from risk_analyzer.config import get_settings
+    from risk_analyzer.prescoring import PrescoreScheduler, ResultCache
+
+    monkeypatch.setenv("JOGET_TENANTS", json.dumps({"vida": {
+        "base_url": "http://vida.joget.test/jw",
+        "username": "vida",
+        "password": "secret",
+        "app_id": "vidaWorkflow",
+        "tramite_form_id": "vidaPolicies",
+    }}))
+    get_settings.cache_clear()
+    monkeypatch.setattr(api, "_graph_app", None)
+    monkeypatch.setattr(api, "_registry", None)
+    monkeypatch.setattr(api, "_llm", None)
+    monkeypatch.setattr(api, "ChatOpenAI", lambda **kwargs: RunnableLambda(lambda prompt: '{"delta": 0.0}'))
+    monkeypatch.setattr(api, "_prescorer", PrescoreScheduler(_never_called, ResultCache(ttl_seconds=60), debounce_seconds=3600))
+    try:
+        event = client.post("/events/joget", json={"id": "ID-1", "tenant": "vida"})
+        assert event.status_code == 202
+        assert event.json() == {"id": "ID-1", "tenant": "vida", "status": "scheduled"}
+        assert client.post("/events/joget", json={"id": "ID-1", "tenant": "autos"}).status_code == 404
+    finally:
+        if api._registry is not None:
+            api._registry.close()
+        get_settings.cache_clear()
+
+
+def test_simulate_endpoint(monkeypatch, joget_env, tmp_path):
+    """Test /simulate evaluates rule overrides over the configured snapshot."""
+    from risk_analyzer.config import get_settings
+    from risk_analyzer.schemas import TramiteFolio
+    from risk_analyzer.simulation import FeatureSnapshot
+
+    assert client.post("/simulate", json={}).status_code == 404
+
+    path = tmp_path / "features.snap"
+    FeatureSnapshot.from_folios([
+        TramiteFolio(id="A", ramo="Vida", tipo_tramite="Emisión", monto_prima=800_000, requiere_reaseguro=True),
+        TramiteFolio(id="B", ramo="Autos", tipo_tramite="Emisión", monto_prima=800_000, requiere_reaseguro=False),
+    ]).save(path)
+    monkeypatch.setenv("SIMULATION_SNAPSHOT_PATH", str(path))
+    get_settings.cache_clear()
+
+    response = client.post("/simulate", json={"rules": {"premium_threshold": 500_000}})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["transitions"]["bajo"]["alto"] == 1
+    assert data["affected"] == [{"id": "A", "from": "bajo", "to": "alto"}]
+
+
+def test_analyze_records_root_span(monkeypatch, joget_env):
+    """Test /analyze opens a root span carrying folio, cache and admission attributes."""
+    from risk_analyzer import api, tracing
+    from risk_analyzer.admission import AdmissionController
+
+    exporter = tracing.InMemoryExporter()
+    monkeypatch.setattr(tracing, "_tracer", tracing.Tracer(exporter))
+    from risk_analyzer.prescoring import PrescoreScheduler, ResultCache
+
+    monkeypatch.setattr(api, "_graph_app", _FakeGraph())
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1, max_queue=0))
+    monkeypatch.setattr(api, "_prescorer", PrescoreScheduler(_never_called, ResultCache(ttl_seconds=60)))
+
+    assert client.post("/analyze/ID-1", params={"refresh": True}).status_code == 200
+    assert client.post("/analyze/ID-2", headers={"X-Priority": "vip"}).status_code == 400
+
+    ok, rejected = exporter.spans
+    assert ok.name == "analyze" and ok.parent_id is None
+    assert ok.attributes["folio_id"] == "ID-1"
+    assert ok.attributes["cache_hit"] is False
+    assert ok.attributes["priority"] == "normal"
+    assert "queue_wait_ms" in ok.attributes
+    assert rejected.status == "error" and rejected.attributes["status_code"] == 400
@@ -0,0 +1,91 @@
+import json
+import logging
+
+import pytest
+
+from risk_analyzer.backfill import run_backfill
+from risk_analyzer.replay import encode_record
+
+
+logger = logging.getLogger(__name__)
+
+
+def _pairs(count: int):
+    for i in range(count):
+        yield f"ID-{i}", {
+            "id": f"ID-{i}",
+            "ramo": "Vida" if i % 2 else "Autos",
+            "tipo_tramite": "Emisión",
+            "monto_prima": "2000000",
+            "requiere_reaseguro": "on" if i % 3 == 0 else "",
+            "documents": json.dumps([{"name": "Contrato", "required": True, "uploaded": False}]),
+        }
+
+
+def _records(pairs):
+    return [encode_record("app", "form", key, payload).encode("utf-8") for key, payload in pairs]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_preserves_input_order(workers):
+    results = list(run_backfill(_records(_pairs(25)), workers=workers, chunk_size=4))
+    logger.info(f"Backfill produced {len(results)} results with workers={workers}")
+
+    assert [r["id"] for r in results] == [f"ID-{i}" for i in range(25)]
+    assert all("error" not in r for r in results)
+    assert results[1]["risk"]["level"] == "medio"  # Vida >= 1M: 0.6 + 1 missing doc 0.05
+    assert results[0]["signals"]["missing_docs"] == ["Contrato"]
+
+
+def test_backfill_reports_invalid_payloads_without_aborting():
+    pairs = [("OK", next(_pairs(1))[1]), ("BAD", {"id": "BAD"})]
+    results = list(run_backfill(_records(pairs) + [b"not json"], workers=1))
+
+    assert results[0]["id"] == "OK" and "risk" in results[0]
+    assert results[1]["id"] == "BAD"
+    assert "ValidationError" in results[1]["error"]
+    assert results[2]["id"] is None and "JSONDecodeError" in results[2]["error"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_scores_duplicate_ids_with_their_own_payload(workers):
+    _, payload = next(_pairs(1))
+    pairs = [("DUP", {**payload, "id": "DUP", "ramo": "Autos"}), ("DUP", {**payload, "id": "DUP", "ramo": "Vida"})]
+    results = list(run_backfill(_records(pairs), workers=workers, chunk_size=2))
+
+    assert [r["signals"]["ramo"] for r in results] == ["Autos", "Vida"]
+
+
+def test_backfill_keeps_unicode_line_separators_inside_records():
+    _, payload = next(_pairs(1))
+    pairs = [("SEP", {**payload, "id": "SEP", "ramo": "Vida\u2028x\u2029y\u0085z"}), ("NEXT", {**payload, "id": "NEXT"})]
+    results = list(run_backfill(_records(pairs), workers=1))
+
+    assert [r["id"] for r in results] == ["SEP", "NEXT"]
+    assert results[0]["signals"]["ramo"] == "Vida\u2028x\u2029y\u0085z"
+
+
+def test_cli_configures_logging_from_settings_and_stops_listener(tmp_path, monkeypatch):
+    from risk_analyzer import backfill
+    from risk_analyzer.replay import PayloadRecorder
+
+    class _Listener:
+        stopped = False
+
+        def stop(self):
+            self.stopped = True
+
+    listener = _Listener()
+    calls = []
+    monkeypatch.setattr(backfill, "configure_logging", lambda **kwargs: calls.append(kwargs) or listener)
+
+    archive, output = tmp_path / "payloads.jsonl", tmp_path / "results.jsonl"
+    with PayloadRecorder(archive) as recorder:
+        for key, payload in _pairs(3):
+            recorder.record("app", "form", key, payload)
+    monkeypatch.setattr("sys.argv", ["backfill", "--input", str(archive), "--output", str(output), "--workers", "1"])
+    backfill.main()
+
+    assert [json.loads(line)["id"] for line in output.read_text(encoding="utf-8").splitlines()] == ["ID-0", "ID-1", "ID-2"]
+    assert len(calls) == 1 and "fmt" in calls[0]
+    assert listener.stopped
@@ -0,0 +1,138 @@
+"""Tests for bounded documents-grid parsing and payload limits."""
+
+import json
+import logging
+
+import httpx
+import pytest
+
+from risk_analyzer.documents import iter_grid_rows, parse_documents
+from risk_analyzer.joget_adapter import JogetClient, JogetError
+from risk_analyzer.prompt_payload import LLMPayloadBuilder
+from risk_analyzer.scoring import heuristic_score
+
+
+logger = logging.getLogger(__name__)
+
+
+def _grid(rows: int) -> str:
+    return json.dumps([
+        {"name": f"Documento {i}", "required": "on", "uploaded": "on" if i % 2 == 0 else ""}
+        for i in range(rows)
+    ])
+
+
+def _payload(rows: int) -> dict:
+    return {
+        "id": "F-1",
+        "ramo": "Daños",
+        "tipo_tramite": "Emisión",
+        "monto_prima": "1500000",
+        "requiere_reaseguro": "on",
+        "documents": _grid(rows),
+    }
+
+
+def _client(handler, **kwargs) -> JogetClient:
+    client = JogetClient(
+        base_url="http://joget.test/jw",
+        username="admin",
+        password="admin",
+        app_id="insurancePolicyWorkflow",
+        tramite_form_id="insurancePolicies",
+        **kwargs,
+    )
+    client._session = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_iter_grid_rows_matches_json_loads():
+    """Test the incremental decoder yields exactly the rows json.loads would."""
+    text = ' [ {"name": "A", "required": "on"} ,{"name": "B, \\"x\\"", "uploaded": null}, 3 ]'
+    assert list(iter_grid_rows(text)) == json.loads(text)
+    assert list(iter_grid_rows("[]")) == []
+    assert list(iter_grid_rows([{"name": "A"}])) == [{"name": "A"}]
+    assert list(iter_grid_rows(None)) == []
+    with pytest.raises(ValueError):
+        list(iter_grid_rows('[{"name": "A"}'))
+
+
+def test_parse_documents_caps_models_but_counts_every_row():
+    """Test only the first rows become models while the summary covers the whole grid."""
+    documents, summary = parse_documents(_grid(5000), max_documents=10, max_missing_names=3)
+
+    assert len(documents) == 10
+    assert (summary.total, summary.required, summary.uploaded, summary.missing) == (5000, 5000, 2500, 2500)
+    assert summary.missing_names == ["Documento 1", "Documento 3", "Documento 5"]
+
+    documents, summary = parse_documents('[{"name": "A"}, oops]')
+    assert documents == [] and summary.total == 0
+
+
+def test_hydrated_summary_drives_scoring_and_payload():
+    """Test scoring and the LLM payload use counts beyond the materialized documents."""
+    folio = JogetClient.hydrate_tramite(_payload(1000), max_documents=5)
+    logger.debug("Summary: %s", folio.document_summary)
+
+    assert len(folio.documents) == 5
+    assert "Solicitar 500 documentos faltantes" in heuristic_score(folio).recommendations
+
+    signals = {"missing_docs": folio.document_summary.missing_names, "missing_docs_count": 500}
+    payload = LLMPayloadBuilder(top_missing=2).build(folio, signals, heuristic_score(folio))
+    documents_view = json.loads(payload["folio"])["documents"]
+    assert documents_view["missing"] == 500
+    assert documents_view["missing_names"] == ["Documento 1", "Documento 3"]
+    assert json.loads(payload["signals"])["missing_docs_count"] == 500
+
+
+def test_payload_size_limit():
+    """Test oversized Joget responses are rejected, whether or not they declare a length."""
+    body = json.dumps(_payload(2000)).encode()
+
+    def declared(request):
+        return httpx.Response(200, content=body)
+
+    def chunked(request):
+        return httpx.Response(200, content=iter([body[i:i + 4096] for i in range(0, len(body), 4096)]))
+
+    with _client(declared, max_payload_bytes=len(body) - 1) as client:
+        with pytest.raises(JogetError, match="limit"):
+            client.fetch_tramite("F-1")
+    with _client(chunked, max_payload_bytes=len(body) - 1) as client:
+        with pytest.raises(JogetError, match="exceeds"):
+            client.fetch_tramite("F-1")
+    with _client(chunked, max_payload_bytes=len(body), max_documents=20) as client:
+        folio = client.fetch_tramite("F-1")
+    assert len(folio.documents) == 20
+    assert folio.document_summary.total == 2000
+
+
+def test_report_marks_missing_names_beyond_the_cap():
+    """Test the report lists the kept missing names plus how many were left out."""
+    from risk_analyzer.graph import build_app
+    from risk_analyzer.replay import ReplayJogetClient
+    from risk_analyzer.schemas import AnalyzerState
+
+    grid = json.dumps([{"name": f"D{i}", "required": "on"} for i in range(120)])
+    app = build_app(llm=None, joget_client=ReplayJogetClient({"F-1": {**_payload(0), "documents": grid}}))
+    result = app.invoke(AnalyzerState(id="F-1"))
+
+    assert len(result["signals"]["missing_docs"]) == 50
+    assert result["signals"]["missing_docs_count"] == 120
+    assert "Documentos faltantes: D0, D1" in result["report"]
+    assert "D49 (+70 más)" in result["report"]
+    assert "Solicitar 120 documentos faltantes" in result["report"]
+
+
+def test_missing_names_cap_is_configurable(joget_env, monkeypatch):
+    """Test JOGET_MAX_MISSING_NAMES bounds the names a live client keeps."""
+    from risk_analyzer.config import get_settings
+
+    monkeypatch.setenv("JOGET_MAX_MISSING_NAMES", "3")
+    get_settings.cache_clear()
+    with JogetClient() as client:
+        client._session = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=_payload(100))))
+        folio = client.fetch_tramite("F-1")
+    get_settings.cache_clear()
+    assert folio.document_summary.missing_names == ["Documento 1", "Documento 3", "Documento 5"]
+    assert folio.document_summary.missing == 50
@@ -0,0 +1,62 @@
+import json
+import logging
+
+import pytest
+
+from risk_analyzer.logging_setup import DebugSampler, JsonFormatter, configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def restore_root_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _record(level: int, msg: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("risk_analyzer.graph", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(_record(logging.INFO, "score=%.2f", 0.5, folio="WFE-1"))
+    entry = json.loads(line)
+
+    assert entry["message"] == "score=0.50"
+    assert entry["folio"] == "WFE-1"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "risk_analyzer.graph"
+
+
+def test_debug_sampler_is_stable_per_folio():
+    sampler = DebugSampler(0.25)
+    kept = {f"F-{i}" for i in range(2000) if sampler.filter(_record(logging.DEBUG, "x", folio=f"F-{i}"))}
+    logger.debug(f"Sampler kept {len(kept)} of 2000 folios")
+
+    assert 350 < len(kept) < 650
+    # Every debug record of a kept folio passes; non-debug and folio-less records always pass
+    assert all(sampler.filter(_record(logging.DEBUG, "y", folio=folio)) for folio in kept)
+    assert sampler.filter(_record(logging.INFO, "z", folio="dropped-or-not"))
+    assert sampler.filter(_record(logging.DEBUG, "no folio"))
+
+
+def test_background_json_logging(capsys, restore_root_logging):
+    listener = configure_logging(level="DEBUG", fmt="json", debug_sample_rate=0.0)
+    assert listener is not None
+
+    logging.getLogger("risk_analyzer.test").info("Final score=%.2f", 0.75, extra={"folio": "F-1"})
+    logging.getLogger("risk_analyzer.test").debug("sampled out", extra={"folio": "F-1"})
+    listener.stop()
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [entry["message"] for entry in lines] == ["Final score=0.75"]
+    assert lines[0]["folio"] == "F-1"
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+from risk_analyzer.prescoring import PrescoreScheduler, ResultCache
+
+
+logger = logging.getLogger(__name__)
+
+
+def test_result_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ResultCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.put("c", {"v": 3})
+
+    assert cache.get("a") is None  # evicted
+    assert cache.get("b") == {"v": 2}
+    now[0] = 11
+    assert cache.get("b") is None  # expired
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_rapid_saves_are_debounced_into_one_analysis():
+    calls: list[str] = []
+
+    async def run(key: str) -> dict:
+        calls.append(key)
+        return {"id": key, "run": len(calls)}
+
+    async def scenario():
+        scheduler = PrescoreScheduler(run, ResultCache(ttl_seconds=60), debounce_seconds=0.01)
+        statuses = [scheduler.submit("F-1") for _ in range(5)] + [scheduler.submit("F-2")]
+        await scheduler.drain()
+        return scheduler, statuses
+
+    scheduler, statuses = asyncio.run(scenario())
+    logger.debug(f"Submit statuses={statuses} stats={scheduler.stats()}")
+
+    assert statuses == ["scheduled"] + ["debounced"] * 4 + ["scheduled"]
+    assert sorted(calls) == ["F-1", "F-2"]
+    assert scheduler.cache.get("F-1") == {"id": "F-1", "run": calls.index("F-1") + 1}
+
+
+def test_event_during_run_triggers_one_follow_up():
+    calls: list[str] = []
+
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def run(key: str) -> dict:
+            calls.append(key)
+            if len(calls) == 1:
+                started.set()
+                await release.wait()
+            return {"run": len(calls)}
+
+        scheduler = PrescoreScheduler(run, ResultCache(ttl_seconds=60), debounce_seconds=0)
+        scheduler.submit("F-1")
+        await started.wait()
+        statuses = [scheduler.submit("F-1"), scheduler.submit("F-1")]
+        release.set()
+        await scheduler.drain()
+        return scheduler, statuses
+
+    scheduler, statuses = asyncio.run(scenario())
+
+    assert statuses == ["queued", "queued"]
+    assert calls == ["F-1", "F-1"]
+    assert scheduler.cache.get("F-1") == {"run": 2}
@@ -0,0 +1,39 @@
+import logging
+
+from risk_analyzer.graph import build_app
+from risk_analyzer.profiling import RequestProfiler
+from risk_analyzer.replay import ReplayJogetClient
+from risk_analyzer.schemas import AnalyzerState
+
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD = {"id": "ID-1", "ramo": "Vida", "tipo_tramite": "Emisión", "monto_prima": "2000000", "requiere_reaseguro": "on"}
+
+
+def test_profiler_samples_and_bounds_buffer():
+    profiler = RequestProfiler(sample_rate=0.5, capacity=2, rng=iter([0.1, 0.9]).__next__)
+
+    assert profiler.should_profile() is True
+    assert profiler.should_profile() is False
+    assert RequestProfiler().should_profile(forced=True) is True
+
+    for i in range(3):
+        assert profiler.run(f"F-{i}", sum, [1, 2]) == 3
+    assert [record.folio_id for record in profiler.records()] == ["F-1", "F-2"]
+
+
+def test_profiled_graph_reports_hot_functions_by_component():
+    app = build_app(llm=None, joget_client=ReplayJogetClient({"ID-1": PAYLOAD}))
+    profiler = RequestProfiler(trace_memory=True)
+
+    result = profiler.run("ID-1", app.invoke, AnalyzerState(id="ID-1"))
+    report = profiler.report(limit=5)
+    logger.debug(f"Profile report components={ {k: len(v) for k, v in report['components'].items()} }")
+
+    assert result["risk"]["level"] == "alto"
+    assert report["profiles"] == 1
+    assert report["recent"][0]["peak_memory_kb"] > 0
+    assert any("score_risk" in row["function"] for row in report["components"]["graph"])
+    assert any("heuristic_score" in row["function"] for row in report["components"]["scoring"])
+    assert len(report["hot_functions"]) == 5
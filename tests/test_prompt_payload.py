@@ -0,0 +1,80 @@
+import json
+import logging
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from risk_analyzer.graph import build_app
+from risk_analyzer.prompt_payload import LLMPayloadBuilder
+from risk_analyzer.replay import ReplayJogetClient
+from risk_analyzer.schemas import AnalyzerState, TramiteDocument, TramiteFolio
+from risk_analyzer.scoring import heuristic_score
+
+
+logger = logging.getLogger(__name__)
+
+
+def _folio(documents: int) -> TramiteFolio:
+    return TramiteFolio(
+        id="WFE-123",
+        ramo="Daños",
+        tipo_tramite="Emisión",
+        monto_prima=1_500_000,
+        requiere_reaseguro=True,
+        documents=[TramiteDocument(name=f"Documento {i}", required=True, uploaded=i % 2 == 0) for i in range(documents)],
+    )
+
+
+def test_payload_summarizes_documents_and_selects_fields():
+    folio = _folio(300)
+    signals = {"missing_docs": [d.name for d in folio.documents if not d.uploaded], "ramo": "Daños"}
+    builder = LLMPayloadBuilder(fields=("id", "monto_prima", "updated_at"), top_missing=3)
+
+    payload = builder.build(folio, signals, heuristic_score(folio))
+    folio_view = json.loads(payload["folio"])
+    logger.debug(f"Compact payload={payload}")
+
+    assert set(folio_view) == {"id", "monto_prima", "documents"}  # updated_at is None and dropped
+    assert folio_view["documents"] == {
+        "total": 300,
+        "required": 300,
+        "uploaded": 150,
+        "missing": 150,
+        "missing_names": ["Documento 1", "Documento 3", "Documento 5"],
+    }
+    assert json.loads(payload["signals"]) == {"ramo": "Daños", "missing_docs_count": 150}
+    assert " " not in payload["baseline"].split('"recommendations"')[0]
+
+    full_size = len(str(folio.model_dump())) + len(str(signals))
+    assert len(payload["folio"]) + len(payload["signals"]) < full_size / 20
+
+
+def test_unknown_payload_fields_are_rejected(monkeypatch):
+    from risk_analyzer.config import get_settings
+
+    with pytest.raises(ValueError, match=r"\['monto', 'estado'\]"):
+        LLMPayloadBuilder(fields=("id", "monto", "estado"))
+
+    monkeypatch.setenv("LLM_PAYLOAD_FIELDS", "id, ramo, monto_primo")
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="monto_primo"):
+            LLMPayloadBuilder.from_settings(get_settings())
+    finally:
+        get_settings.cache_clear()
+
+
+def test_score_risk_reports_prompt_tokens():
+    prompts: list[str] = []
+
+    def fake_llm(prompt_value):
+        prompts.append(prompt_value.to_string())
+        return '{"delta": 0.0, "rationale": "ok", "recommendations": []}'
+
+    payload = {"id": "ID-1", "ramo": "Vida", "tipo_tramite": "Emisión", "monto_prima": "100", "requiere_reaseguro": ""}
+    app = build_app(llm=RunnableLambda(fake_llm), joget_client=ReplayJogetClient({"ID-1": payload}))
+
+    result = app.invoke(AnalyzerState(id="ID-1"))
+
+    assert result["risk"]["prompt_tokens"] > 0
+    assert '"ramo":"Vida"' in prompts[0]
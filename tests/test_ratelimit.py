@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from risk_analyzer.graph import build_app
+from risk_analyzer.ratelimit import LLMRateLimiter, TokenBucket, estimate_tokens
+from risk_analyzer.replay import ReplayJogetClient
+from risk_analyzer.schemas import AnalyzerState
+
+
+logger = logging.getLogger(__name__)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # one unit per second
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == 2.0
+    clock.now += 2.0
+    assert bucket.reserve(1) == 1.0
+
+
+def test_limiter_spaces_requests_to_quota():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(requests_per_minute=2, tokens_per_minute=1_000, completion_tokens=100, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire(200) for _ in range(4)]
+    logger.debug(f"Limiter waits={waits}")
+
+    # RPM binds: one request every 30s once the burst of 2 is spent. TPM (300 of
+    # 1000 tokens per request, refilled at ~16.7/s) has room again after each wait.
+    assert waits == pytest.approx([0.0, 0.0, 30.0, 30.0])
+    assert clock.now == pytest.approx(sum(waits))
+
+
+def test_limiter_waits_on_tokens_when_tpm_binds():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(requests_per_minute=60, tokens_per_minute=900, completion_tokens=100, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire(200) for _ in range(4)]
+    logger.debug(f"Limiter waits={waits}")
+
+    # 900 tokens fit three 300-token requests; the fourth waits 300 tokens / 15 per second
+    assert waits == pytest.approx([0.0, 0.0, 0.0, 20.0])
+    assert clock.now == pytest.approx(20.0)
+
+    rpm_only = LLMRateLimiter(requests_per_minute=60, clock=clock, sleep=clock.sleep)
+    assert [rpm_only.acquire(200) for _ in range(4)] == [0.0] * 4
+
+
+def test_score_risk_acquires_budget_before_llm_call():
+    acquired: list[int] = []
+
+    class RecordingLimiter(LLMRateLimiter):
+        def acquire(self, prompt_tokens: int) -> float:
+            acquired.append(prompt_tokens)
+            return 0.0
+
+    payload = {"id": "ID-1", "ramo": "Autos", "tipo_tramite": "Emisión", "monto_prima": "100", "requiere_reaseguro": ""}
+    llm = RunnableLambda(lambda prompt_value: '{"delta": 0.1, "rationale": "ok", "recommendations": []}')
+    app = build_app(llm=llm, joget_client=ReplayJogetClient({"ID-1": payload}), rate_limiter=RecordingLimiter(requests_per_minute=10))
+
+    result = app.invoke(AnalyzerState(id="ID-1"))
+
+    assert result["risk"]["llm_delta"] == 0.1
+    assert len(acquired) == 1 and acquired[0] > 0
+
+
+def test_estimate_tokens_from_length():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 100
@@ -0,0 +1,121 @@
+import json
+import logging
+
+import httpx
+import pytest
+
+from risk_analyzer.graph import build_app
+from risk_analyzer.joget_adapter import JogetClient, JogetError
+from risk_analyzer.replay import PayloadArchive, PayloadRecorder, ReplayJogetClient
+from risk_analyzer.schemas import AnalyzerState
+
+
+logger = logging.getLogger(__name__)
+
+
+def _payload(folio_id: str, prima: str = "1500000") -> dict:
+    return {
+        "id": folio_id,
+        "ramo": "Daños",
+        "tipo_tramite": "Emisión",
+        "monto_prima": prima,
+        "requiere_reaseguro": "on",
+        "es_urgente": "",
+        "estatus": "En revisión",
+        "documents": json.dumps([
+            {"name": "Contrato", "required": "true", "uploaded": ""},
+            {"name": "INE", "required": "", "uploaded": ""},
+        ]),
+    }
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_recorder_round_trips_through_archive(tmp_path, suffix):
+    path = tmp_path / f"payloads{suffix}"
+    with PayloadRecorder(path) as recorder:
+        recorder.record("app", "form", "ID-1", _payload("ID-1"))
+        recorder.record("app", "form", "ID-2", _payload("ID-2", prima="100"))
+        recorder.record("app", "form", "ID-1", _payload("ID-1", prima="2000000"))
+
+    with PayloadArchive(path) as archive:
+        logger.debug(f"Archive keys={list(archive)}")
+        assert sorted(archive) == ["ID-1", "ID-2"]
+        assert archive["ID-2"]["monto_prima"] == "100"
+        assert archive["ID-1"]["monto_prima"] == "2000000"
+        assert json.loads(archive.raw("ID-2")) == {
+            "primary_key": "ID-2", "app_id": "app", "form_id": "form", "payload": _payload("ID-2", prima="100"),
+        }
+
+
+def test_joget_client_records_payloads(tmp_path, joget_env):
+    path = tmp_path / "recorded.jsonl"
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_payload("ID-7")))
+
+    with PayloadRecorder(path) as recorder:
+        client = JogetClient(recorder=recorder)
+        client._session = httpx.Client(transport=transport)
+        folio = client.fetch_tramite("ID-7")
+        client.close()
+
+    assert folio.id == "ID-7"
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert record["primary_key"] == "ID-7"
+    assert record["app_id"] == joget_env.joget_app_id
+    assert record["payload"]["ramo"] == "Daños"
+
+
+def test_replay_client_drives_graph_offline(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    with PayloadRecorder(path) as recorder:
+        recorder.record("app", "form", "ID-1", _payload("ID-1"))
+
+    client = ReplayJogetClient(path)
+    app = build_app(llm=None, joget_client=client)
+    result = app.invoke(AnalyzerState(id="ID-1"))
+    logger.info(f"Replay risk={result['risk']}")
+
+    assert result["folio"].id == "ID-1"
+    assert result["signals"]["missing_docs"] == ["Contrato"]
+    assert result["risk"]["level"] == "alto"
+
+    with pytest.raises(JogetError):
+        client.fetch_tramite("missing")
+    client.close()
+
+
+def test_cli_replay_runs_without_joget_settings(tmp_path, monkeypatch, capsys):
+    from langchain_core.runnables import RunnableLambda
+
+    from risk_analyzer import main as cli
+    from risk_analyzer.config import get_settings
+
+    path = tmp_path / "replay.jsonl"
+    with PayloadRecorder(path) as recorder:
+        recorder.record("app", "form", "ID-1", _payload("ID-1"))
+
+    for name in ("JOGET_BASE_URL", "JOGET_USERNAME", "JOGET_PASSWORD", "JOGET_APP_ID", "JOGET_TRAMITE_FORM_ID"):
+        monkeypatch.delenv(name, raising=False)
+    get_settings.cache_clear()
+    monkeypatch.setattr(cli, "configure_logging", lambda **kwargs: None)
+    monkeypatch.setattr(cli, "ChatOpenAI", lambda **kwargs: RunnableLambda(lambda prompt: '{"delta": 0.0}'))
+    monkeypatch.setattr("sys.argv", ["risk-analyzer", "--id", "ID-1", "--replay", str(path), "--env-file", str(tmp_path / "none.env")])
+    try:
+        cli.main()
+        assert "Folio **ID-1**" in capsys.readouterr().out
+
+        # A live client still insists on the Joget configuration
+        with pytest.raises(ValueError, match="JOGET_BASE_URL"):
+            JogetClient()
+    finally:
+        get_settings.cache_clear()
+
+
+def test_replay_client_applies_document_caps():
+    grid = json.dumps([{"name": f"D{i}", "required": "on"} for i in range(10)])
+    client = ReplayJogetClient({"ID-1": {**_payload("ID-1"), "documents": grid}}, max_documents=2, max_missing_names=3)
+
+    folio = client.fetch_tramite("ID-1")
+
+    assert len(folio.documents) == 2
+    assert folio.document_summary.missing_names == ["D0", "D1", "D2"]
+    assert folio.document_summary.missing == 10
@@ -0,0 +1,66 @@
+import dataclasses
+import logging
+
+import pytest
+
+from risk_analyzer.reporting import DEFAULT_TEMPLATES, ReportRenderer
+
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def risk():
+    return {
+        "score": 0.95,
+        "level": "alto",
+        "rationale": "Prima <alta> & reaseguro",
+        "recommendations": ["Confirmar capacidad de reasegurador"],
+        "baseline_score": 0.85,
+        "llm_delta": 0.1,
+    }
+
+
+def test_markdown_report_layout(risk):
+    report = ReportRenderer().render("WFE-123", risk, ["Contrato", "Carátula"])
+    logger.debug(f"Markdown report:\n{report}")
+
+    assert report.splitlines() == [
+        "Folio **WFE-123**",
+        "Nivel de riesgo: **ALTO** (0.95) [Heurístico: 0.85 + LLM: +0.10]",
+        "Motivo: Prima <alta> & reaseguro",
+        "Documentos faltantes: Contrato, Carátula",
+        "Recomendaciones:",
+        "- Confirmar capacidad de reasegurador",
+    ]
+
+
+def test_html_report_escapes_values(risk):
+    report = ReportRenderer().render("<b>WFE</b>", {**risk, "llm_delta": 0.0}, [], "html")
+
+    assert report.startswith("<h2>Folio &lt;b&gt;WFE&lt;/b&gt;</h2>")
+    assert "Prima &lt;alta&gt; &amp; reaseguro" in report
+    assert "[Heurístico: 0.85]" in report
+    assert "<li>Confirmar capacidad de reasegurador</li>" in report
+
+
+def test_identical_outcomes_share_cached_body(risk):
+    renderer = ReportRenderer()
+    first = renderer.render("A", risk, ["Contrato"])
+    second = renderer.render("B", risk, ["Contrato"])
+
+    assert (renderer.hits, renderer.misses) == (1, 1)
+    assert first.replace("**A**", "**B**") == second
+
+
+def test_registering_template_invalidates_cache(risk):
+    renderer = ReportRenderer()
+    renderer.render("A", risk, [])
+    renderer.register("markdown", dataclasses.replace(DEFAULT_TEMPLATES["markdown"], rationale="Causa: {rationale}"))
+
+    report = renderer.render("A", risk, [])
+    assert renderer.misses == 2
+    assert "Causa: Prima" in report
+
+    with pytest.raises(ValueError):
+        renderer.render("A", risk, [], "pdf")
@@ -0,0 +1,88 @@
+import logging
+import random
+import time
+
+import pytest
+
+from risk_analyzer.schemas import HeuristicRules, TramiteDocument, TramiteFolio
+from risk_analyzer.scoring import heuristic_score
+from risk_analyzer.simulation import FeatureSnapshot, simulate
+
+
+logger = logging.getLogger(__name__)
+
+
+def _random_folios(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        missing = rng.randint(0, 4)
+        yield TramiteFolio(
+            id=f"F-{i}",
+            ramo=rng.choice(["Daños", "Vida", "Autos", "Gastos Médicos"]),
+            tipo_tramite="Emisión",
+            monto_prima=rng.choice([50_000, 600_000, 999_999, 1_000_000, 2_500_000]),
+            requiere_reaseguro=rng.random() < 0.3,
+            es_urgente=rng.choice([True, False, None]),
+            documents=[TramiteDocument(name=f"D{j}", required=True, uploaded=False) for j in range(missing)],
+        )
+
+
+@pytest.fixture(scope="module")
+def folios():
+    return list(_random_folios(400))
+
+
+def test_default_rules_match_heuristic_score(folios):
+    snapshot = FeatureSnapshot.from_folios(folios)
+    custom = HeuristicRules(premium_threshold=500_000, missing_doc_increment=0.1, missing_docs_cap=0.3)
+
+    result = simulate(snapshot, custom, affected_limit=10_000)
+    logger.debug(f"Transitions={result['transitions']}")
+
+    expected = {f.id: (heuristic_score(f).level, heuristic_score(f, rules=custom).level) for f in folios}
+    changed = {(a["id"], a["from"], a["to"]) for a in result["affected"]}
+    assert changed == {(fid, old, new) for fid, (old, new) in expected.items() if old != new}
+    assert result["changed"] == len(changed) > 0
+    assert sum(sum(row.values()) for row in result["transitions"].values()) == len(folios)
+
+    unchanged = simulate(snapshot, HeuristicRules())
+    assert unchanged["changed"] == 0
+
+
+def test_snapshot_round_trip(tmp_path, folios):
+    path = tmp_path / "features.snap"
+    FeatureSnapshot.from_folios(folios).save(path)
+
+    loaded = FeatureSnapshot.load(path)
+    result = simulate(loaded, HeuristicRules(critical_ramos=["autos"]), affected_limit=3)
+
+    assert len(loaded) == len(folios)
+    assert loaded.ids[:2] == ["F-0", "F-1"]
+    assert len(result["affected"]) == 3
+    assert result["affected_truncated"] is True
+
+
+def test_snapshot_round_trips_ids_with_separators(tmp_path, folios):
+    path = tmp_path / "features.snap"
+    snapshot = FeatureSnapshot.from_folios(folios[:3])
+    snapshot.ids = ["F-0\nF-1", "", "F-\u2028x"]
+    snapshot.save(path)
+
+    loaded = FeatureSnapshot.load(path)
+    assert loaded.ids == ["F-0\nF-1", "", "F-\u2028x"]
+    assert loaded.columns["prima"].tolist() == snapshot.columns["prima"].tolist()
+
+
+def test_simulation_scales_to_large_portfolios(folios):
+    snapshot = FeatureSnapshot.from_folios(folios)
+    for name, column in snapshot.columns.items():
+        snapshot.columns[name] = column * 250  # 100k rows
+    snapshot.ids = snapshot.ids * 250
+
+    start = time.perf_counter()
+    result = simulate(snapshot, HeuristicRules(premium_threshold=2_000_000))
+    elapsed = time.perf_counter() - start
+    logger.info(f"Simulated {result['folios']} folios in {elapsed:.2f}s")
+
+    assert result["folios"] == 100_000
+    assert elapsed < 5
@@ -0,0 +1,111 @@
+"""Tests for the multi-tenant Joget registry."""
+
+import json
+import logging
+
+import httpx
+import pytest
+
+from risk_analyzer.tenants import DEFAULT_TENANT, TenantConfig, TenantRegistry, cache_key, split_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+
+def _config(name, app_id, form_id="insurancePolicies"):
+    return TenantConfig(
+        name=name,
+        base_url=f"http://{name}.joget.test/jw",
+        username="admin",
+        password="admin",
+        app_id=app_id,
+        tramite_form_id=form_id,
+    )
+
+
+def test_registry_loads_extra_tenants_from_settings(joget_env, monkeypatch):
+    """Test the default tenant comes from JOGET_* and extra tenants from JOGET_TENANTS."""
+    from risk_analyzer.config import get_settings
+
+    monkeypatch.setenv("JOGET_TENANTS", json.dumps({
+        "vida": {
+            "base_url": "http://vida.joget.test/jw",
+            "username": "vida",
+            "password": "secret",
+            "app_id": "vidaWorkflow",
+            "tramite_form_id": "vidaPolicies",
+            "max_connections": 5,
+        }
+    }))
+    get_settings.cache_clear()
+
+    built = []
+    registry = TenantRegistry.from_settings(get_settings(), lambda client: built.append(client) or client)
+    try:
+        assert registry.names() == ["default", "vida"]
+        assert registry.get().config.app_id == "insurancePolicyWorkflow"
+        assert registry.get("vida").config.max_connections == 5
+        with pytest.raises(KeyError):
+            registry.get("autos")
+
+        # Graphs are compiled on first use, once per tenant, over that tenant's client
+        vida = registry.get("vida")
+        assert built == []
+        assert vida.graph is vida.client
+        assert vida.graph is vida.client
+        assert built == [vida.client]
+    finally:
+        registry.close()
+
+
+def test_tenants_fetch_from_their_own_app_and_form():
+    """Test each tenant's client queries its own Joget app and form."""
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, json={"id": "F-1", "ramo": "vida", "tipo_tramite": "emision", "monto_prima": 10})
+
+    registry = TenantRegistry(
+        [_config(DEFAULT_TENANT, "insurancePolicyWorkflow"), _config("vida", "vidaWorkflow", "vidaPolicies")],
+        graph_factory=lambda client: client,
+    )
+    try:
+        for tenant in (registry.get(), registry.get("vida")):
+            tenant.client._session = httpx.Client(transport=httpx.MockTransport(handler))
+            tenant.graph.fetch_tramite("F-1")
+    finally:
+        registry.close()
+
+    logger.debug("Requested paths: %s", requested)
+    assert requested[0].endswith("/data/form/load/insurancePolicyWorkflow/insurancePolicies/F-1")
+    assert requested[1].endswith("/data/form/load/vidaWorkflow/vidaPolicies/F-1")
+
+
+def test_registry_requires_default_tenant_and_namespaces_keys():
+    """Test registries without a default tenant are rejected and cache keys round-trip."""
+    with pytest.raises(ValueError):
+        TenantRegistry([_config("vida", "vidaWorkflow")], graph_factory=lambda client: client)
+
+    assert cache_key("vida", "F-1") == "vida:F-1"
+    assert split_cache_key(cache_key("vida", "F:1")) == ("vida", "F:1")
+
+
+@pytest.mark.parametrize("name", ["vida:autos", "", "vida autos"])
+def test_registry_rejects_tenant_names_that_break_cache_keys(joget_env, monkeypatch, name):
+    """Test JOGET_TENANTS names are validated so namespaced cache keys stay unambiguous."""
+    from risk_analyzer.config import get_settings
+
+    monkeypatch.setenv("JOGET_TENANTS", json.dumps({name: {
+        "base_url": "http://vida.joget.test/jw",
+        "username": "vida",
+        "password": "secret",
+        "app_id": "vidaWorkflow",
+        "tramite_form_id": "vidaPolicies",
+    }}))
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="name"):
+            TenantRegistry.from_settings(get_settings(), lambda client: client)
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,136 @@
+"""Tests for request tracing spans and exporters."""
+
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+from langchain_core.runnables import RunnableLambda
+from starlette.concurrency import run_in_threadpool
+
+from risk_analyzer import tracing
+from risk_analyzer.graph import build_app
+from risk_analyzer.joget_adapter import JogetClient
+from risk_analyzer.ratelimit import LLMRateLimiter
+from risk_analyzer.schemas import AnalyzerState
+
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = tracing.InMemoryExporter()
+    monkeypatch.setattr(tracing, "_tracer", tracing.Tracer(exporter))
+    return exporter
+
+
+def test_spans_nest_and_export_once_per_trace(exporter):
+    """Test children share the root's trace, errors are recorded and the trace is exported at root end."""
+    with tracing.span("root", folio_id="F-1") as root:
+        with tracing.span("child") as child:
+            assert tracing.current_span() is child
+            child.set_attribute("documents", 3)
+        assert exporter.spans == []
+        with pytest.raises(RuntimeError):
+            with tracing.span("failing"):
+                raise RuntimeError("boom")
+    assert tracing.current_span() is tracing.NOOP_SPAN
+
+    names = [span.name for span in exporter.spans]
+    assert names == ["child", "failing", "root"]
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+    assert exporter.spans[0].parent_id == root.span_id
+    assert exporter.spans[0].attributes == {"documents": 3}
+    assert exporter.spans[1].status == "error" and exporter.spans[1].error == "RuntimeError: boom"
+    assert all(span.duration_ms is not None for span in exporter.spans)
+
+
+def test_unsampled_and_disabled_tracers_record_nothing():
+    """Test sampling is decided once per root and a tracer without exporter is a no-op."""
+    exporter = tracing.InMemoryExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=0.5, rng=iter([0.9, 0.1]).__next__)
+    with tracer.span("unsampled"):
+        with tracer.span("child") as child:
+            assert not child.recording
+    with tracer.span("sampled"):
+        pass
+    assert [span.name for span in exporter.spans] == ["sampled"]
+
+    with tracing.Tracer().span("off") as span:
+        assert span is tracing.NOOP_SPAN
+
+
+def test_graph_spans_propagate_through_threadpool(exporter):
+    """Test node, Joget HTTP and LLM spans nest under a root opened on the event loop."""
+    payload = {
+        "id": "F-1",
+        "ramo": "Daños",
+        "tipo_tramite": "Emisión",
+        "monto_prima": "1500000",
+        "requiere_reaseguro": "on",
+        "documents": json.dumps([{"name": "Contrato", "required": "on"}, {"name": "INE", "required": "on", "uploaded": "on"}]),
+    }
+    client = JogetClient(
+        base_url="http://joget.test/jw",
+        username="admin",
+        password="admin",
+        app_id="insurancePolicyWorkflow",
+        tramite_form_id="insurancePolicies",
+    )
+    client._session = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+    llm = RunnableLambda(lambda prompt: '{"delta": 0.1, "rationale": "ok", "recommendations": []}')
+    app = build_app(llm=llm, joget_client=client, rate_limiter=LLMRateLimiter(requests_per_minute=600))
+
+    async def analyze():
+        with tracing.span("analyze", folio_id="F-1"):
+            return await run_in_threadpool(app.invoke, AnalyzerState(id="F-1"))
+
+    asyncio.run(analyze())
+    client.close()
+
+    spans = {span.name: span for span in exporter.spans}
+    logger.debug("Spans: %s", [span.to_dict() for span in exporter.spans])
+    assert set(spans) == {
+        "analyze", "fetch_tramite", "joget.http", "enrich_context", "score_risk", "llm.rate_limit", "llm", "render_report",
+    }
+    assert len({span.trace_id for span in exporter.spans}) == 1
+    for child, parent in [
+        ("fetch_tramite", "analyze"),
+        ("joget.http", "fetch_tramite"),
+        ("score_risk", "analyze"),
+        ("llm", "score_risk"),
+        ("render_report", "analyze"),
+    ]:
+        assert spans[child].parent_id == spans[parent].span_id
+    assert spans["fetch_tramite"].attributes["documents"] == 2
+    assert spans["fetch_tramite"].attributes["missing_docs"] == 1
+    assert spans["joget.http"].attributes["status_code"] == 200
+    assert spans["llm"].attributes["prompt_tokens"] > 0
+    assert spans["score_risk"].attributes["llm_delta"] == 0.1
+
+
+def test_jsonl_exporter_and_summary(tmp_path):
+    """Test the JSONL exporter writes one line per span and summarize ranks slow traces."""
+    path = tmp_path / "traces.jsonl"
+    tracer = tracing.configure_tracing("jsonl", jsonl_path=path)
+    try:
+        for folio_id in ("F-1", "F-2"):
+            with tracer.span("analyze", folio_id=folio_id):
+                with tracer.span("score_risk"):
+                    pass
+    finally:
+        tracer.close()
+        tracing.set_tracer(tracing.Tracer())
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["name"] for record in records] == ["score_risk", "analyze"] * 2
+
+    summary = tracing.summarize(path, limit=1)
+    assert len(summary) == 1
+    assert summary[0]["name"] == "analyze"
+    assert list(summary[0]["spans"]) == ["score_risk"]
+
+    with pytest.raises(ValueError):
+        tracing.build_exporter("zipkin")